@@ -8,13 +8,17 @@ class Matcher(metaclass=abc.ABCMeta):
         self.engine = engine
 
     @abc.abstractmethod
-    def changes(self, adding=None, deleting=None):  # pragma: no cover
+    def changes(self, adding=None, deleting=None,
+                modifying=None):  # pragma: no cover
         """
         Main interface with the matcher.
 
         Called by the knowledge engine when changes are made in the
         working memory and return a set of activations.
 
+        `modifying` contains `(old_fact, new_fact, changed_fields)`
+        tuples for the facts replaced by a `modify`.
+
         """
         pass
 
@@ -23,6 +27,12 @@ class Matcher(metaclass=abc.ABCMeta):
         """Reset the matcher memory."""
         pass
 
+    def fork(self, engine):  # pragma: no cover
+        """Return a copy of this matcher, in its current state, for
+        `engine`."""
+        raise NotImplementedError(
+            "%s doesn't support forking" % self.__class__.__name__)
+
 
 class Strategy(metaclass=abc.ABCMeta):
     def __init__(self, *args, **kwargs):
@@ -40,7 +50,7 @@ class Strategy(metaclass=abc.ABCMeta):
                     " <== %r: %s %s",
                     getattr(act.rule, '__name__', None),
                     ", ".join(str(f) for f in act.facts),
-                    "[EXECUTED]" if act not in agenda.activations else "")
+                    "[EXECUTED]" if act not in agenda else "")
 
             for act in added:
                 watchers.ACTIVATIONS.info(
@@ -3,31 +3,49 @@ Activations represent rules that matches against a specific factlist.
 
 """
 from functools import total_ordering
-import inspect
+
 
 @total_ordering
 class Activation:
     """
     Activation object
+
+    Activations are immutable: the facts are stored in a frozenset and
+    the hash is computed once on creation.
     """
 
+    __slots__ = ('rule', 'facts', 'context', 'key', '_hash', '__weakref__')
+
     def __init__(self, rule, facts, context=None):
         self.rule = rule
-        #self.ordered_facts = facts
-        self.facts = set(facts)
+        self.facts = frozenset(facts)
         self.key = None
         if context is None:
             self.context = dict()
         else:
             self.context = context
+        self._hash = hash((self.rule,
+                           self.facts,
+                           frozenset(self.context.items())))
 
     def fire(self, ke):
-        #print(len(self.context))
-        return self.rule(
-            ke,
-            **{k: v
-               for k, v in self.context.items()
-               if not k.startswith('__')})
+        """
+        Execute the rule RHS.
+
+        While firing, the activation is available as
+        `ke.current_activation`.
+
+        """
+        previous = ke.current_activation
+        ke.current_activation = self
+        try:
+            return self.rule(
+                ke,
+                **{k: v
+                   for k, v in self.context.items()
+                   if not k.startswith('__')})
+        finally:
+            ke.current_activation = previous
 
     def __repr__(self):  # pragma: no cover
         return "Activation(rule={}, facts={}, context={})".format(
@@ -35,7 +53,8 @@ class Activation:
 
     def __eq__(self, other):
         try:
-            return (self.context == other.context
+            return (self._hash == other._hash
+                    and self.context == other.context
                     and self.facts == other.facts
                     and self.rule == other.rule
                     and self.key == other.key)
@@ -46,6 +65,4 @@ class Activation:
         return self.key < other.key
 
     def __hash__(self):
-        return hash((self.rule,
-                     frozenset(self.facts),
-                     frozenset(self.context.items())))
+        return self._hash
@@ -1,3 +1,8 @@
+from itertools import count
+import bisect
+import heapq
+
+
 class Agenda:
     """
 
@@ -21,6 +26,31 @@ class Agenda:
                                            facts=act.facts)
             for idx, act in enumerate(self.activations))
 
+    def copy(self):
+        """Return a copy of this agenda sharing the activations."""
+        new = self.__class__()
+        new.activations = list(self.activations)
+        return new
+
+    def __contains__(self, activation):
+        return activation in self.activations
+
+    def __len__(self):
+        return len(self.activations)
+
+    def add(self, activation):
+        """Insert an activation with its `key` already set."""
+        bisect.insort(self.activations, activation)
+
+    def remove(self, activation):
+        """Remove an activation with its `key` already set, if present."""
+        lo = bisect.bisect_left(self.activations, activation)
+        hi = bisect.bisect_right(self.activations, activation, lo)
+        for idx in range(lo, hi):
+            if self.activations[idx] == activation:
+                del self.activations[idx]
+                break
+
     def get_next(self):
         """Returns the next activation, removes it from activations list."""
 
@@ -28,3 +58,98 @@ class Agenda:
             return self.activations.pop()
         except IndexError:
             return None
+
+
+class _Reversed:
+    """Invert the ordering of `key`, to use a min-heap as a max-heap."""
+
+    __slots__ = ('key', )
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class HeapAgenda(Agenda):
+    """
+    Agenda for big conflict sets.
+
+    Activations are kept in a heap ordered by their `key` (the greatest
+    key is the next to run, newest first on ties) so insertion and
+    `get_next` are O(log n). Removed activations are marked as invalid
+    in the heap and discarded when they reach the top, or when they
+    outnumber the valid ones.
+
+    `activations` is computed on access and is meant for inspection
+    only.
+
+    """
+    def __init__(self):
+        self.heap = list()
+        self.entries = dict()
+        self.counter = count()
+        self.invalid = 0
+
+    @property
+    def activations(self):
+        """Return the ordered list of activations, the last runs first."""
+        return [entry[-1] for entry in sorted(self.heap, reverse=True)
+                if entry[-1] is not None]
+
+    def copy(self):
+        new = self.__class__()
+        # Entries are invalidated in place, each agenda needs its own.
+        entries = {id(entry): list(entry) for entry in self.heap}
+        new.heap = list(entries.values())
+        new.entries = {act: [entries[id(e)] for e in act_entries]
+                       for act, act_entries in self.entries.items()}
+        new.counter = count(next(self.counter))
+        new.invalid = self.invalid
+        return new
+
+    def __contains__(self, activation):
+        return activation in self.entries
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def add(self, activation):
+        entry = [_Reversed(activation.key), -next(self.counter), activation]
+        self.entries.setdefault(activation, []).append(entry)
+        heapq.heappush(self.heap, entry)
+
+    def remove(self, activation):
+        entries = self.entries.get(activation)
+        if entries:
+            entry = entries.pop()
+            entry[-1] = None
+            if not entries:
+                del self.entries[activation]
+
+            self.invalid += 1
+            if self.invalid * 2 > len(self.heap):
+                self.heap = [e for e in self.heap if e[-1] is not None]
+                heapq.heapify(self.heap)
+                self.invalid = 0
+
+    def get_next(self):
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            activation = entry[-1]
+            if activation is None:
+                self.invalid -= 1
+            else:
+                entries = self.entries[activation]
+                for idx, other in enumerate(entries):
+                    if other is entry:
+                        del entries[idx]
+                        break
+                if not entries:
+                    del self.entries[activation]
+                return activation
+        return None
@@ -8,6 +8,9 @@ class ConditionalElement(tuple):
     def __new__(cls, *args):
         return super(ConditionalElement, cls).__new__(cls, args)
 
+    def __getnewargs__(self):
+        return tuple(self)
+
     def __repr__(self):  # pragma: no cover
         return "%s%s" % (self.__class__.__name__, super().__repr__())
 
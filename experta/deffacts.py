@@ -10,6 +10,7 @@ class DefFacts:
             raise SyntaxError("DefFacts must be instanced to allow decoration")
 
         obj.__wrapped = None
+        obj._wrapped_args = None
         obj._wrapped_self = None
         obj.order = order
 
@@ -23,6 +24,14 @@ class DefFacts:
     def _wrapped(self, value):
         if inspect.isgeneratorfunction(value):
             self.__wrapped = value
+
+            signature = inspect.signature(value)
+            if not any(p.kind == inspect.Parameter.VAR_KEYWORD
+                       for p in signature.parameters.values()):
+                # There is not **kwargs defined. Only the defined names
+                # will be passed on reset.
+                self._wrapped_args = set(signature.parameters.keys())
+
             return update_wrapper(self, self.__wrapped)
         else:
             raise TypeError("DefFact can only decorate generators.")
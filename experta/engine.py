@@ -3,14 +3,13 @@
 
 """
 
+import copy
 import inspect
 import logging
 from itertools import chain
 
-import experta
 from experta import abstract
 from experta import watchers
-from experta.agenda import Agenda
 from experta.deffacts import DefFacts
 from experta.fact import Fact
 from experta.fact import InitialFact
@@ -32,11 +31,14 @@ class KnowledgeEngine:
     """
     from experta.matchers import ReteMatcher as __matcher__
     from experta.strategies import DepthStrategy as __strategy__
+    from experta.agenda import Agenda as __agenda__
 
     def __init__(self):
         self.running = False
+        self.current_activation = None
         self.facts = FactList()
-        self.agenda = Agenda()
+        self.agenda = self.__agenda__()
+        self.__reset_children()
 
         self.init_matcher()
 
@@ -79,12 +81,56 @@ class KnowledgeEngine:
             >>> ke.modify(my_fact, _0="hello", _1="world", other_key="!")
 
         """
-        self.retract(declared_fact)
+        modifiers = dict(self._get_real_modifiers(**modifiers))
 
         newfact = declared_fact.copy()
-        newfact.update(dict(self._get_real_modifiers(**modifiers)))
+        newfact.update(modifiers)
+        self.__check_declarable([newfact])
 
-        return self.declare(newfact)
+        # Fields whose value actually changed; the matcher reuses the
+        # result of the checks over the rest.
+        changed = {k for k in modifiers
+                   if k not in declared_fact or declared_fact[k] != newfact[k]}
+
+        try:
+            declared = self.facts.modify(declared_fact, newfact, changed)
+            self.__cascade([declared_fact])
+            self.__link_source([newfact])
+        finally:
+            if not self.running:
+                added, removed = self.get_activations()
+                self.strategy.update_agenda(self.agenda, added, removed)
+
+        return declared
+
+    def fork(self):
+        """
+        Return a new engine in the same state as this one.
+
+        Both engines share the compiled network and the facts, while
+        the fact list, the agenda and the node memories are copied, so
+        changes made in one engine don't affect the other.
+
+        Other instance attributes are shallow copied.
+
+        .. note::
+
+            Facts shouldn't be modified in place, as they are shared.
+            For the same reason, from now on the facts declared by the
+            activations of the shared facts are kept by each engine
+            instead of in their `__children__`.
+        """
+        other = copy.copy(self)
+        other.running = False
+        other.current_activation = None
+        self.__shared_facts = other.__shared_facts = self.facts.last_index
+        other.__children = {factid: list(children)
+                            for factid, children in self.__children.items()}
+        other.facts = self.facts.copy()
+        other.agenda = self.agenda.copy()
+        other.strategy = copy.copy(self.strategy)
+        other.matcher = self.matcher.fork(other)
+        return other
 
     def duplicate(self, template_fact, **modifiers):
         """Create a new fact from an existing one."""
@@ -98,11 +144,32 @@ class KnowledgeEngine:
     def _declare_initial_fact(self):
         yield InitialFact()
 
+    @classmethod
+    def _get_member_names(cls, wanted_type):
+        """
+        Return the sorted names of the `Rule` or `DefFacts` attributes
+        of the class.
+
+        The class is inspected only the first time, the names are cached
+        in the class itself.
+        """
+        names = cls.__dict__.get('_member_names')
+        if names is None:
+            names = {Rule: [], DefFacts: []}
+            for name in sorted(dir(cls)):
+                obj = inspect.getattr_static(cls, name)
+                for member_type, found in names.items():
+                    if isinstance(obj, member_type):
+                        found.append(name)
+            cls._member_names = names
+
+        return names[wanted_type]
+
     def _get_by_type(self, wanted_type):
-        for _, obj in inspect.getmembers(self):
-            if isinstance(obj, wanted_type):
-                obj.ke = self
-                yield obj
+        for name in self._get_member_names(wanted_type):
+            obj = getattr(self, name)
+            obj.ke = self
+            yield obj
 
     def get_rules(self):
         """Return the existing rules."""
@@ -126,24 +193,33 @@ class KnowledgeEngine:
         .. note::
             This updates the agenda
         """
-        # if type(idx_or_declared_fact) is dict:
-        # idx_or_declared_fact = idx_or_declared_fact['__factid__']
+        self.retract_many([idx_or_declared_fact], cascade=cascade)
 
-        if type(idx_or_declared_fact) is int:
-            idx_or_declared_fact = self.facts[idx_or_declared_fact]
+    def retract_many(self, facts, cascade=True):
+        """
+        Retract several facts (or fact indexes) at once.
 
-        self.facts.retract(idx_or_declared_fact)
+        The changes are propagated through the network in a single pass
+        and the agenda is updated once.
 
-        if not self.running:
-            added, removed = self.get_activations()
-            self.strategy.update_agenda(self.agenda, added, removed)
+        .. note::
+            This updates the agenda
+        """
+        retracted = []
+        try:
+            for idx_or_declared_fact in facts:
+                if type(idx_or_declared_fact) is int:
+                    idx_or_declared_fact = self.facts[idx_or_declared_fact]
+
+                self.facts.retract(idx_or_declared_fact)
+                retracted.append(idx_or_declared_fact)
 
-        if cascade:
-            for child in idx_or_declared_fact.__children__:
-                try:
-                    self.retract(child)
-                except IndexError:  # child has already been deleted
-                    pass
+            if cascade:
+                self.__cascade(retracted)
+        finally:
+            if not self.running:
+                added, removed = self.get_activations()
+                self.strategy.update_agenda(self.agenda, added, removed)
 
     def step(self):
         """
@@ -207,23 +283,20 @@ class KnowledgeEngine:
                   re-declared.
         """
 
-        self.agenda = Agenda()
+        self.agenda = self.__agenda__()
         self.facts = FactList()
+        self.__reset_children()
 
         self.matcher.reset()
 
         deffacts = []
         for deffact in self.get_deffacts():
-
-            signature = inspect.signature(deffact)
-            if not any(p.kind == inspect.Parameter.VAR_KEYWORD
-                       for p in signature.parameters.values()):
+            if deffact._wrapped_args is not None:
                 # There is not **kwargs defined. Pass only the defined
                 # names.
-                args = set(signature.parameters.keys())
                 deffacts.append(
                     deffact(**{k: v for k, v in kwargs.items()
-                               if k in args}))
+                               if k in deffact._wrapped_args}))
             else:
                 deffacts.append(deffact(**kwargs))
 
@@ -232,72 +305,120 @@ class KnowledgeEngine:
         self.__declare(*chain.from_iterable(deffacts), cond=True)
 
         self.running = False
-        self.matcher._get_conflict_set_nodes.cache_clear()
 
     def __declare(self, *facts, cond=False):
 
         """
         Internal declaration method. Used for ``declare`` and ``deffacts``
+
+        Return a list with the result of declaring each fact: the
+        declared fact or `None` if it was already present.
         """
+        self.__check_declarable(facts)
+
+        inserted = [self.facts.declare(fact) for fact in facts]
+
+        if not self.running:
+            added, removed = self.get_activations()
+
+            self.strategy.update_agenda(self.agenda, added, removed)
+
+        return inserted
+
+    @staticmethod
+    def __check_declarable(facts):
+        """Raise if any of `facts` cannot be declared."""
         if any(f.has_field_constraints() for f in facts):
             raise TypeError(
                 "Declared facts cannot contain conditional elements")
         elif any(f.has_nested_accessor() for f in facts):
             raise KeyError(
                 "Cannot declare facts containing double underscores as keys.")
-        else:
 
-            last_inserted = None
+    def __cascade(self, retracted):
+        """
+        Retract the facts declared by the activations of `retracted`.
 
+        Retracted children are appended to `retracted` so their own
+        children are retracted too.
+        """
+        for fact in retracted:
+            children = self.__get_children(fact)
+            self.__children.pop(fact.__factid__, None)
+            for child in children:
+                if self.facts.get(child.__factid__) is not child:
+                    # Already deleted.
+                    continue
+                self.facts.retract(child)
+                retracted.append(child)
+
+    def __link_source(self, facts):
+        """Link the given facts to the activation being fired, if any."""
+        activation = self.current_activation
+        if activation is not None:
             for fact in facts:
-                last_inserted = self.facts.declare(fact)
-
-            if not self.running:
-                added, removed = self.get_activations()
-
-                self.strategy.update_agenda(self.agenda, added, removed)
+                fact.__source__ = activation
+                for f in activation.facts:
+                    if isinstance(f, Fact):
+                        self.__get_children(f, writable=True).append(fact)
+
+    def __reset_children(self):
+        # Facts with a lower id are shared with forked engines and their
+        # children are kept in `__children` by `factid`.
+        self.__shared_facts = 0
+        self.__children = dict()
+
+    def __get_children(self, fact, writable=False):
+        """
+        Return the facts declared by the activations of `fact` in this
+        engine.
 
-            return last_inserted
+        If `writable` is true the list of a fact shared with forked engines
+        is copied so it can be changed.
+        """
+        factid = fact.__factid__
+        if factid is None or factid >= self.__shared_facts:
+            return fact.__children__
+        elif writable:
+            try:
+                return self.__children[factid]
+            except KeyError:
+                children = self.__children[factid] = list(fact.__children__)
+                return children
+        else:
+            return self.__children.get(factid, fact.__children__)
 
     def declare(self, *facts):
         """
         Declare from inside a fact, equivalent to ``assert`` in clips.
 
+        Facts declared while an activation is firing are linked to it
+        (see `__source__` and `__children__`).
+
         .. note::
 
             This updates the agenda.
         """
-        # try:
-        #     activation_frame = inspect.currentframe().f_back.f_back.f_back
-        #     assert type(activation_frame.f_locals[
-        #                     'self']) == experta.activation.Activation
-        #     for fact in facts:
-        #         fact.__source__ = activation_frame.f_locals['self']
-        #         for f in fact.__source__.facts:
-        #             if not isinstance(f, Fact):
-        #                 continue
-        #             f.__children__.append(fact)
-        # except (AssertionError, AttributeError, KeyError):
-        #     pass
-
-        try:
-            activation_frame = inspect.currentframe().f_back
-            for i in range(7):
-                if 'self' in activation_frame.f_locals:
-                    if type(activation_frame.f_locals[
-                                'self']) == experta.activation.Activation:
-                        for fact in facts:
-                            fact.__source__ = activation_frame.f_locals['self']
-                            for f in fact.__source__.facts:
-                                if not isinstance(f, Fact):
-                                    continue
-                                f.__children__.append(fact)
-                        break
-                activation_frame = activation_frame.f_back
-        except (AssertionError, AttributeError, KeyError) as e:
-            pass
+        self.__link_source(facts)
 
         if not self.facts:
             pass  # watchers.ENGINE.warning("Declaring fact before reset()")
 
-        return self.__declare(*facts)
+        inserted = self.__declare(*facts)
+        return inserted[-1] if inserted else None
+
+    def declare_many(self, facts):
+        """
+        Declare all the facts of the iterable `facts` at once.
+
+        The new facts are propagated through the network in a single pass
+        and the agenda is updated once. Return the list of declared
+        facts; facts already present in the fact list are skipped.
+
+        .. note::
+
+            This updates the agenda.
+        """
+        facts = list(facts)
+        self.__link_source(facts)
+        return [f for f in self.__declare(*facts) if f is not None]
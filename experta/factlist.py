@@ -33,6 +33,7 @@ class FactList(OrderedDict):
         self.reference_counter = Counter()
         self.added = list()
         self.removed = list()
+        self.modified = list()
         self.duplication = False
 
     def __str__(self):  # pragma: no cover
@@ -124,13 +125,57 @@ class FactList(OrderedDict):
 
         return idx
 
+    def copy(self):
+        """Return a copy of this fact list sharing the facts."""
+        new = self.__class__()
+        new.update(self)
+        new.last_index = self.last_index
+        new.reference_counter = self.reference_counter.copy()
+        new.added = list(self.added)
+        new.removed = list(self.removed)
+        new.modified = list(self.modified)
+        new.duplication = self.duplication
+        return new
+
+    def modify(self, fact, newfact, changed):
+        """
+        Retract `fact` and declare `newfact` in its place.
+
+        `changed` is the set of fields in which both facts differ. The
+        change is reported in `modified` instead of `added` and
+        `removed`, unless `newfact` is already in the list.
+
+        :return: The declared fact or `None` if it was already present.
+        :throws ValueError: If `newfact` is not a valid Fact, in which
+                            case `fact` is kept.
+        """
+        if not isinstance(newfact, Fact):
+            raise ValueError('The fact must descend the Fact class.')
+
+        # Validate before retracting, will raise on validation error.
+        newfact.validate()
+
+        self.retract(fact)
+        self.removed.pop()
+
+        declared = self.declare(newfact)
+        if declared is None:
+            self.removed.append(fact)
+        else:
+            self.added.pop()
+            self.modified.append((fact, declared, changed))
+
+        return declared
+
     @property
     def changes(self):
         """
-        Return a tuple with the removed and added facts since last run.
+        Return a tuple with the added, removed and modified facts since
+        last run.
         """
         try:
-            return self.added, self.removed
+            return self.added, self.removed, self.modified
         finally:
             self.added = list()
             self.removed = list()
+            self.modified = list()
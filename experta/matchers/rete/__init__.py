@@ -10,26 +10,49 @@ a more pythonic approach.
 """
 import re
 from collections import Counter
-from functools import lru_cache
 from itertools import chain
 import copy
+import weakref
 
 from experta import OR
 from experta.abstract import Matcher
 from experta.fact import InitialFact
+from experta.fieldconstraint import L
 from experta.rule import Rule
 from .check import TypeCheck, FactCapture, FeatureCheck
 from .nodes import BusNode, ConflictSetNode, FeatureTesterNode
+from .nodes import LiteralSwitchNode, RangeSwitchNode
+from .nodes import MembershipSwitchNode, PatternSwitchNode
+from .persistence import NetworkCache
 from .utils import prepare_rule, extract_facts, generate_checks, wire_rule
 
 
 class ReteMatcher(Matcher):
-    """RETE algorithm with `experta` matcher interface."""
+    """
+    RETE algorithm with `experta` matcher interface.
+
+    The network of each engine class is compiled only once. Matchers
+    get a copy of this template with their own node memories.
+    """
+
+    # Engine class -> {matcher class: root node of the network template}
+    _templates = weakref.WeakKeyDictionary()
+
+    #: `NetworkCache` used to store the compiled networks on disk.
+    network_cache = None
+
+    #: Join the patterns of the rules by estimated selectivity instead
+    #: of in the written order (see `utils.order_joins`).
+    reorder_joins = False
 
     def __init__(self, *args, **kwargs):
         """Create the RETE network for `self.engine`."""
         super().__init__(*args, **kwargs)
-        self.root_node = BusNode()
+        self.root_node = None
+        # ConflictSetNodes with pending changes, used as an ordered set.
+        self.changed_nodes = dict()
+        # ConflictSetNodes of the network, collected on the first change.
+        self.conflict_set_nodes = None
         self.build_network()
 
     def __deepcopy__(self, memo):
@@ -43,24 +66,32 @@ class ReteMatcher(Matcher):
         result.__init__(result.engine)
         return result
 
-    @lru_cache(maxsize=1)
-    def _get_conflict_set_nodes(self):
+    def _link_conflict_set_nodes(self):
+        """
+        Collect the conflict set nodes of the network and make them
+        report their changes to this matcher.
+
+        """
         nodes = list()
+        visited = set()
 
         def _get_csn(node):
-            #print(node, isinstance(node, ConflictSetNode))
+            if node in visited:  # Shared by several parents.
+                return
+            visited.add(node)
             if isinstance(node, ConflictSetNode):
                 yield node
             for child in node.children:
                 yield from _get_csn(child.node)
 
+        self.changed_nodes = dict()
         for node in _get_csn(self.root_node):
+            nodes.append(node)
+            node.changed_nodes = self.changed_nodes
+            if node.added or node.removed:
+                self.changed_nodes[node] = None
 
-            if node not in nodes:
-                nodes.append(node)
-
-
-        return tuple(nodes)
+        self.conflict_set_nodes = tuple(nodes)
 
     def log_network(self):
         print("printing...")
@@ -72,13 +103,40 @@ class ReteMatcher(Matcher):
 
         _get_csn(self.root_node)
 
-    def changes(self, adding=None, deleting=None):
-        """Pass the given changes to the root_node."""
+    def changes(self, adding=None, deleting=None, modifying=None):
+        """
+        Pass the given changes to the root_node.
+
+        Return the activations added and removed by the conflict set
+        nodes reached by the changes.
+
+        """
+        if self.conflict_set_nodes is None:
+            self._link_conflict_set_nodes()
 
         if deleting is not None:
             for deleted in deleting:
                 self.root_node.remove(deleted)
 
+        if modifying:
+            # Outside `run` a modification is a retract followed by a
+            # declare, each one updating the agenda, so the activations
+            # not holding the modified fact (like the ones of `EXISTS`)
+            # are removed and added again instead of cancelling out.
+            # Inside `run` the changes of the fired activation are
+            # applied at once and these pairs cancel out.
+            refresh = not self.engine.running
+            if refresh:
+                for csn in self.changed_nodes:
+                    csn.refreshed.clear()
+
+            for old, new, changed in modifying:
+                self.root_node.modify(old, new, changed)
+
+            if refresh:
+                for csn in self.changed_nodes:
+                    csn.refresh()
+
         if adding is not None:
             for added in adding:
                 self.root_node.add(added)
@@ -86,7 +144,10 @@ class ReteMatcher(Matcher):
         added = list()
         removed = list()
 
-        for csn in self._get_conflict_set_nodes():
+        changed = list(self.changed_nodes)
+        self.changed_nodes.clear()
+
+        for csn in changed:
 
             c_added, c_removed = csn.get_activations()
 
@@ -96,12 +157,66 @@ class ReteMatcher(Matcher):
         return (added, removed)
 
     def build_network(self):
-        ruleset = self.prepare_ruleset(self.engine)
-        alpha_terminals = self.build_alpha_part(ruleset, self.root_node)
-        self.build_beta_part(ruleset, alpha_terminals)
+        """Copy the compiled network of the engine class."""
+        templates = self._templates.setdefault(type(self.engine), dict())
+        try:
+            template = templates[type(self)]
+        except KeyError:
+            template = templates[type(self)] = self.load_network(
+                self.engine)
+
+        self.root_node = template.clone()
+        self.conflict_set_nodes = None
+
+    @classmethod
+    def load_network(cls, engine):
+        """
+        Return the compiled network for the class of `engine`.
+
+        If `network_cache` is set the network is read from it, or
+        compiled and stored there.
+
+        """
+        if cls.network_cache is not None:
+            root_node = cls.network_cache.load(type(engine), cls)
+            if root_node is not None:
+                return root_node
+
+        root_node = BusNode()
+        cls.compile_network(engine, root_node)
+
+        if cls.network_cache is not None:
+            cls.network_cache.save(type(engine), cls, root_node)
+
+        return root_node
+
+    @classmethod
+    def compile_network(cls, engine, root_node):
+        """Build the RETE network for the rules of `engine`."""
+        ruleset = cls.prepare_ruleset(engine)
+        alpha_terminals = cls.build_alpha_part(ruleset, root_node)
+        cls.build_beta_part(ruleset, alpha_terminals, cls.reorder_joins)
 
     def reset(self):
         self.root_node.reset()
+        self.changed_nodes.clear()
+
+    def fork(self, engine):
+        """
+        Return a copy of this matcher in its current state for `engine`.
+
+        The copy shares the network compiled for the engine class and
+        copies the node memories.
+
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        result.__dict__.update(self.__dict__)
+        result.engine = engine
+        result.root_node = self.root_node.clone(copy_memory=True)
+        result.changed_nodes = dict()
+        result.conflict_set_nodes = None
+        return result
 
 
 
@@ -173,10 +288,37 @@ class ReteMatcher(Matcher):
                     reverse=True)
 
                 for check in fact_sorted_checks:
+                    if not isinstance(check, FeatureCheck):
+                        switch_class = None
+                    elif isinstance(check.how, L):
+                        switch_class = LiteralSwitchNode
+                    elif RangeSwitchNode.get_bounds(check) is not None:
+                        switch_class = RangeSwitchNode
+                    elif MembershipSwitchNode.get_kind(check) is not None:
+                        switch_class = MembershipSwitchNode
+                    elif PatternSwitchNode.get_prefix(check) is not None:
+                        switch_class = PatternSwitchNode
+                    else:
+                        switch_class = None
+
+                    if switch_class is not None:
+                        # Literal, numeric, membership and pattern tests
+                        # over the same field hang from a common switch
+                        # node.
+                        for child in current_node.children:
+                            if (type(child.node) is switch_class
+                                    and child.node.what == check.what):
+                                current_node = child.node
+                                break
+                        else:
+                            switch = switch_class(check)
+                            current_node.add_child(switch, switch.activate)
+                            current_node = switch
+
                     # Look for a child node with the given check in the
                     # current parent node.
                     for child in current_node.children:
-                        if child.node.matcher is check:
+                        if getattr(child.node, 'matcher', None) is check:
                             current_node = child.node
                             break
                     else:
@@ -192,19 +334,27 @@ class ReteMatcher(Matcher):
         return fact_terminal_nodes
 
     @staticmethod
-    def build_beta_part(ruleset, alpha_terminals):
+    def build_beta_part(ruleset, alpha_terminals, reorder_joins=False):
         """
         Given a set of already adapted rules, and a dictionary of
         patterns and alpha_nodes, wire up the beta part of the RETE
         network.
 
+        Rules with a common LHS prefix share the beta nodes built for
+        it.
+
         """
+        shared_nodes = dict()
         for rule in ruleset:
             if isinstance(rule[0], OR):
                 for subrule in rule[0]:
-                    wire_rule(rule, alpha_terminals, lhs=subrule)
+                    wire_rule(rule, alpha_terminals, lhs=subrule,
+                              reorder_joins=reorder_joins,
+                              shared_nodes=shared_nodes)
             else:
-                wire_rule(rule, alpha_terminals, lhs=rule)
+                wire_rule(rule, alpha_terminals, lhs=rule,
+                          reorder_joins=reorder_joins,
+                          shared_nodes=shared_nodes)
 
     def isomorphic(self, other):
         """ a rough equality test between different instances of
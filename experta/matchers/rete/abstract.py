@@ -1,5 +1,6 @@
 """Abstract base classes for the RETE implementation."""
 import abc
+import copy
 
 from experta import watchers
 
@@ -9,9 +10,44 @@ class Node(metaclass=abc.ABCMeta):
 
     def __init__(self):
         """Initialize `self.children` and reset the node own memory."""
-        self.children = list()
+        self._init_children()
         self._reset()  # Reset it's OWN memory.
 
+    def _init_children(self):
+        """Create the empty containers of the node children."""
+        self.children = list()
+
+    def clone(self, memo=None, copy_memory=False):
+        """
+        Return a copy of the network starting at this node.
+
+        The copied nodes share everything built when the network was
+        compiled (matchers, rules, join keys) but have their own
+        memories, which are empty unless `copy_memory` is true. `memo`
+        maps the id of the nodes already copied to their copy, so nodes
+        with several parents are copied once.
+
+        """
+        if memo is None:
+            memo = dict()
+
+        try:
+            return memo[id(self)]
+        except KeyError:
+            node = memo[id(self)] = copy.copy(self)
+
+        node._init_children()
+        if copy_memory:
+            node._copy_memory()
+        else:
+            node._reset()
+        for child in self.children:
+            new_child = child.node.clone(memo, copy_memory)
+            node.add_child(new_child,
+                           getattr(new_child, child.callback.__name__))
+
+        return node
+
     @abc.abstractmethod
     def add_child(self, child, callback):  # pragma: no cover
         """Add a child to `self.children` if necessary."""
@@ -29,21 +65,35 @@ class Node(metaclass=abc.ABCMeta):
         """Reset this node's memory."""
         pass
 
+    def _copy_memory(self):  # pragma: no cover
+        """Replace the memory shared with the cloned node by a copy."""
+        raise NotImplementedError(
+            "%s can't copy its memory" % self.__class__.__name__)
+
     def __str__(self):  # pragma: no cover
         return self.__class__.__name__
 
 
+def _log_activation(how):
+    """Return a hook logging the node activations `how`."""
+    def _log(node, token):
+        watchers.MATCHER.debug("Node <%s> %s with token %r", node, how, token)
+    return _log
+
+
 class OneInputNode(Node):
     """Nodes which only have one input port."""
 
+    @watchers.instrumented('MATCHER', before=_log_activation('activated'))
     def activate(self, token):
-        """Make a copy of the received token and call `self._activate`."""
+        """
+        Call `self._activate` with the received token.
 
-        if watchers.worth('MATCHER', 'DEBUG'):  # pragma: no cover
-            watchers.MATCHER.debug(
-                "Node <%s> activated with token %r", self, token)
+        Tokens are shared between nodes and must not be modified, a node
+        extending the context must build a new token.
 
-        return self._activate(token.copy())
+        """
+        return self._activate(token)
 
     @abc.abstractproperty
     def _activate(self, token):  # pragma: no cover
@@ -54,22 +104,22 @@ class OneInputNode(Node):
 class TwoInputNode(Node):
     """Nodes which have two input ports: left and right."""
 
+    @watchers.instrumented('MATCHER',
+                           before=_log_activation('activated left'))
     def activate_left(self, token):
-        """Make a copy of the received token and call `_activate_left`."""
-        watchers.MATCHER.debug(
-            "Node <%s> activated left with token %r", self, token)
-        return self._activate_left(token.copy())
+        """Call `_activate_left` with the received token."""
+        return self._activate_left(token)
 
     @abc.abstractproperty
     def _activate_left(self, token):  # pragma: no cover
         """Node left activation routine."""
         pass
 
+    @watchers.instrumented('MATCHER',
+                           before=_log_activation('activated right'))
     def activate_right(self, token):
-        """Make a copy of the received token and call `_activate_right`."""
-        watchers.MATCHER.debug(
-            "Node <%s> activated right with token %r", self, token)
-        return self._activate_right(token.copy())
+        """Call `_activate_right` with the received token."""
+        return self._activate_right(token)
 
     @abc.abstractproperty
     def _activate_right(self, token):  # pragma: no cover
@@ -1,6 +1,7 @@
 from collections import namedtuple
 from collections.abc import Mapping
 from functools import singledispatch
+from operator import itemgetter
 import dis
 import inspect
 
@@ -8,13 +9,18 @@ from experta.fieldconstraint import FieldConstraint
 from experta.fieldconstraint import L, P, W
 from experta.fieldconstraint import ANDFC, ORFC, NOTFC
 from .abstract import Check
-from experta.watchers import MATCH
+from experta.watchers import MATCH, instrumented
 
 
 CheckFunction = namedtuple('CheckFunction',
                            ['key_a', 'key_b', 'expected', 'check'])
 
 
+def _log_type_check(res, check, fact):
+    log = MATCH.info if res else MATCH.debug
+    log("type(%s) == %s = %r", fact, check.fact_type.__name__, res)
+
+
 class TypeCheck(Check, namedtuple('_TypeCheck', ['fact_type'])):
 
     _instances = dict()
@@ -24,19 +30,18 @@ class TypeCheck(Check, namedtuple('_TypeCheck', ['fact_type'])):
             cls._instances[fact_type] = super().__new__(cls, fact_type)
         return cls._instances[fact_type]
 
+    @instrumented('MATCH', 'INFO', after=_log_type_check)
     def __call__(self, fact):
-        res = type(fact) == self.fact_type
-
-        log = MATCH.info if res else MATCH.debug
-        log("type(%s) == %s = %r",
-            fact, self.fact_type.__name__, res)
-
-        return res
+        return type(fact) is self.fact_type
 
     def __str__(self):  # pragma: no cover
         return "type() == %s" % self.fact_type.__name__
 
 
+def _log_fact_capture(capture, fact):
+    MATCH.info("%r <= %s", capture.__bind__, fact)
+
+
 class FactCapture(Check, namedtuple('_FactCapture', ['bind'])):
 
     _instances = dict()
@@ -50,14 +55,19 @@ class FactCapture(Check, namedtuple('_FactCapture', ['bind'])):
     def __bind__(self):
         return self.bind
 
+    @instrumented('MATCH', 'INFO', before=_log_fact_capture)
     def __call__(self, fact):
-        MATCH.info("%r <= %s", self.__bind__, fact)
         return {self.__bind__: fact}
 
     def __str__(self):  # pragma: no cover
         return "%s <= <Fact>" % (self.__bind__)
 
 
+def _log_feature_check(res, check, data, is_fact=True):
+    log = MATCH.info if res else MATCH.debug
+    log("what=%r, how=%r, fact=%s = %r", check.what, check.how, data, res)
+
+
 class FeatureCheck(Check,
                    namedtuple('_FeatureCheck',
                               ['what', 'how', 'check', 'expected'])):
@@ -73,42 +83,86 @@ class FeatureCheck(Check,
         key = (what, check_function.key_a, check_function.key_b)
 
         if key not in cls._instances:
-            cls._instances[key] = super(Check, cls).__new__(
+            obj = super(Check, cls).__new__(
                 cls,
                 what,
                 how,
                 check_function.check,
                 check_function.expected)
+            obj.path = cls.get_path(what)
+            obj.getter = cls.get_getter(obj.path)
+            cls._instances[key] = obj
 
         return cls._instances[key]
 
+    def __reduce__(self):
+        return (self.__class__, (self.what, self.how))
+
+    @staticmethod
+    def get_path(what):
+        """
+        Return the keys to follow from the fact to reach the field.
+
+        Nested fields are separated by a double underscore, and numeric
+        parts are positional indexes. Special names (starting or ending
+        with double underscore) read the fact itself.
+
+        """
+        if not isinstance(what, str):
+            return (what, )
+        elif what.startswith('__') or what.endswith('__'):
+            return ()
+        else:
+            return tuple(int(p) if p.isnumeric() else p
+                         for p in what.split('__'))
+
+    @staticmethod
+    def get_getter(path):
+        """Return a function reading `path` from a fact."""
+        if not path:
+            return lambda fact: fact
+        elif len(path) == 1:
+            return itemgetter(path[0])
+        else:
+            def getter(fact):
+                for key in path:
+                    fact = fact[key]
+                return fact
+            return getter
+
+    def get_value(self, fact):
+        """
+        Return the value of the field `self.what` of `fact`.
+
+        Raise `LookupError` if the fact doesn't have this field.
+
+        """
+        try:
+            return self.getter(fact)
+        except (IndexError, KeyError, TypeError) as exc:
+            raise LookupError(self.what) from exc
+
+    @property
+    def field(self):
+        """
+        Return the top level key of the fact read by this check.
+
+        `None` is returned when the check doesn't read a single key.
+
+        """
+        return self.path[0] if self.path else None
+
+    @instrumented('MATCH', 'INFO', after=_log_feature_check)
     def __call__(self, data, is_fact=True):
         if is_fact:
-            if isinstance(self.what, str):
-                record = data
-                if (not self.what.startswith('__')
-                        and not self.what.endswith('__')):
-                    try:
-                        for p in self.what.split('__'):
-                            if p.isnumeric():
-                                p = int(p)
-                            record = record[p]
-                    except (IndexError, KeyError, TypeError):
-                        return False
-            else:
-                try:
-                    record = data[self.what]
-                except (IndexError, KeyError, TypeError):
-                    return False
+            try:
+                record = self.getter(data)
+            except (IndexError, KeyError, TypeError):
+                return False
         else:
             record = data
 
-        res = self.check(record, self.expected)
-
-        log = MATCH.info if res else MATCH.debug
-        log("what=%r, how=%r, fact=%s = %r", self.what, self.how, data, res)
-
-        return res
+        return self.check(record, self.expected)
 
     def __str__(self):  # pragma: no cover
         return "%s (%s) %s" % (self.what, self.check.__name__, self.expected)
@@ -145,9 +199,16 @@ class FeatureCheck(Check,
             else:
                 return False
 
-        key_b = ('ID',
-                 id(pce.match),
-                 pce.__bind__)
+        try:
+            hash(pce.match)
+        except TypeError:
+            match_key = ('ID', id(pce.match))
+        else:
+            # Hashable predicates (like the ones built by
+            # `experta.operator`) share the check when they are equal.
+            match_key = pce.match
+
+        key_b = (match_key, pce.__bind__)
 
         return CheckFunction(key_a=P,
                              key_b=key_b,
@@ -231,7 +292,13 @@ class FeatureCheck(Check,
                              check=or_match)
 
 
+def _log_same_context_check(res, check, l, r):
+    log = MATCH.info if res else MATCH.debug
+    log("(%s | %s) = %r", l, r, res)
+
+
 class SameContextCheck(Check):
+    @instrumented('MATCH', 'INFO', after=_log_same_context_check)
     def __call__(self, l, r):
         for key, value in l.items():
             if key[0] is False:
@@ -246,6 +313,12 @@ class SameContextCheck(Check):
             return True
 
 
+def _log_where_check(res, check, context):
+    parameters = {k: context.get(k) for k in check.parameters}
+    log = MATCH.info if res else MATCH.debug
+    log("TEST %r(%r) == %r", check.test, parameters, res)
+
+
 class WhereCheck(Check, namedtuple('_WhereCheck', ['test'])):
 
     _instances = dict()
@@ -258,12 +331,9 @@ class WhereCheck(Check, namedtuple('_WhereCheck', ['test'])):
 
         return cls._instances[test]
 
-    def __call__(self, context):
-        parameters = {k: context.get(k) for k in self.parameters}
-
-        res = self.test(**parameters)
+    def __reduce__(self):
+        return (self.__class__, (self.test, ))
 
-        log = MATCH.info if res else MATCH.debug
-        log("TEST %r(%r) == %r", self.test, parameters, res)
-
-        return res
+    @instrumented('MATCH', 'INFO', after=_log_where_check)
+    def __call__(self, context):
+        return self.test(**{k: context.get(k) for k in self.parameters})
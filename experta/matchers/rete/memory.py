@@ -0,0 +1,129 @@
+"""Memories used by the two-input nodes of the RETE network."""
+
+
+class BetaMemory:
+    """
+    Multiset of `TokenInfo` indexed by the value of some context keys.
+
+    Each stored token is placed in a bucket identified by the values
+    its context has for `self.keys`, so the tokens able to join with a
+    given context can be found with a single lookup instead of going
+    over the whole memory.
+
+    Tokens whose context lack any of the keys are stored in a separate
+    bucket which is always returned as candidate. Without keys every
+    token ends up in this bucket and the memory behaves like a plain
+    list.
+    """
+
+    def __init__(self, keys=()):
+        self.keys = tuple(keys)
+        self.buckets = dict()
+        self.size = 0
+        # Keys of the buckets which may be shared with a copy.
+        self.shared = set()
+
+    def copy(self):
+        """
+        Return a copy of this memory.
+
+        The buckets are shared by both memories until one of them
+        modifies it, so the cost of the copy doesn't depend on the
+        number of stored tokens.
+
+        """
+        new = self.__class__(self.keys)
+        new.buckets = dict(self.buckets)
+        new.size = self.size
+        new.shared = set(self.buckets)
+        self.shared = set(self.buckets)
+        return new
+
+    def _get_bucket(self, key):
+        """Return the bucket for `key` ready to be modified."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = dict()
+        elif key in self.shared:
+            bucket = self.buckets[key] = dict(bucket)
+            self.shared.discard(key)
+        return bucket
+
+    def get_key(self, context):
+        """Return the bucket key for `context` or `None`."""
+        if not self.keys:
+            return None
+        try:
+            key = tuple(context[k] for k in self.keys)
+            hash(key)
+        except (KeyError, TypeError):
+            return None
+        else:
+            return key
+
+    def append(self, info, context=None):
+        """Store one occurrence of `info`."""
+        if context is None:
+            context = dict(info.context)
+        bucket = self._get_bucket(self.get_key(context))
+        bucket[info] = bucket.get(info, 0) + 1
+        self.size += 1
+
+    def remove(self, info, context=None):
+        """
+        Remove one occurrence of `info`.
+
+        Raise `ValueError` if it is not present, like `list.remove`.
+
+        """
+        if context is None:
+            context = dict(info.context)
+        key = self.get_key(context)
+        try:
+            count = self.buckets[key][info]
+        except KeyError:
+            raise ValueError("%r not in memory" % (info, )) from None
+
+        bucket = self._get_bucket(key)
+        if count == 1:
+            del bucket[info]
+            if not bucket:
+                del self.buckets[key]
+        else:
+            bucket[info] = count - 1
+        self.size -= 1
+
+    def candidates(self, context):
+        """
+        Yield the stored tokens which may match with `context`.
+
+        The returned tokens must still be tested by the node matcher.
+
+        """
+        key = self.get_key(context)
+        if key is None:
+            yield from self
+        else:
+            for bucket_key in (key, None):
+                bucket = self.buckets.get(bucket_key)
+                if bucket:
+                    for info, count in list(bucket.items()):
+                        for _ in range(count):
+                            yield info
+
+    def __iter__(self):
+        for bucket in list(self.buckets.values()):
+            for info, count in list(bucket.items()):
+                for _ in range(count):
+                    yield info
+
+    def __contains__(self, info):
+        return any(info in bucket for bucket in self.buckets.values())
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(keys=%r, size=%d)" % (self.__class__.__name__,
+                                         self.keys,
+                                         self.size)
@@ -13,6 +13,9 @@ class NoMemory:
     def _reset(self):
         pass
 
+    def _copy_memory(self):
+        pass
+
 
 class AnyChild:
     """This node allow any kind of node as a child."""
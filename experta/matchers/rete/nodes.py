@@ -8,16 +8,59 @@ needed in this implementation.
 """
 from collections.abc import Mapping
 from contextlib import suppress
+from itertools import chain
+from numbers import Real
+import abc
+import bisect
+import operator as op
+import os
+import re
 
 from experta.activation import Activation
+from experta.fieldconstraint import P
+from experta.operator import Predicate, _between, _regex, _like, _ilike
 from experta.rule import Rule
-from experta.watchers import MATCHER, MATCH
+from experta.utils import _isin
+from experta.watchers import MATCHER, instrumented
 
 from . import mixins
 from .abstract import Node, OneInputNode, TwoInputNode
+from .check import TypeCheck, FeatureCheck
+from .memory import BetaMemory
 from .token import Token
 
 
+def _propagate_modify(children, old_token, new_token, changed):
+    """
+    Send the tokens of a modified fact to `children`.
+
+    Children able to handle both tokens at once (the alpha nodes) get
+    them through their `modify` method, the rest receive the INVALID
+    token of the old fact and then the VALID token of the new one.
+    `None` is used in place of the token that didn't reach this point.
+
+    """
+    if old_token is None and new_token is None:
+        return
+
+    for child in children:
+        modify = getattr(child.node, 'modify', None)
+        if modify is not None and child.callback == child.node.activate:
+            modify(old_token, new_token, changed)
+        else:
+            if old_token is not None:
+                child.callback(old_token)
+            if new_token is not None:
+                child.callback(new_token)
+
+
+def _log_bus(how):
+    """Return a hook logging the facts `how` to the network."""
+    def _log(node, fact):
+        MATCHER.debug("<BusNode> %s %r", how, fact)
+    return _log
+
+
 class BusNode(mixins.AnyChild,
               mixins.NoMemory,
               Node):
@@ -30,21 +73,65 @@ class BusNode(mixins.AnyChild,
     This node cannot be activated in the same manner as the other nodes.
     No tokens can be sent to it since this is the node where the first
     tokens are built.
+
+    Children testing the type of the fact (the first node of each alpha
+    branch) are indexed by that type, so a fact is only sent to the
+    branches of its own type and to the children without type check.
     """
 
-    def add(self, fact):
-        """Create a VALID token and send it to all children."""
-        token = Token.valid(fact)
-        MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
+    def _init_children(self):
+        super()._init_children()
+        self.typed_children = dict()
+        self.untyped_children = list()
+
+    def add_child(self, node, callback):
+        """Add the child and index it by its fact type if it has one."""
+        super().add_child(node, callback)
+        child = self.children[-1]
+        if child.node is node:
+            matcher = getattr(node, 'matcher', None)
+            if isinstance(matcher, TypeCheck):
+                self.typed_children.setdefault(
+                    matcher.fact_type, []).append(child)
+            else:
+                self.untyped_children.append(child)
+
+    def _propagate(self, fact, token):
+        for child in self.typed_children.get(type(fact), ()):
+            child.callback(token)
+        for child in self.untyped_children:
             child.callback(token)
 
+    @instrumented('MATCHER', before=_log_bus('added'))
+    def add(self, fact):
+        """Create a VALID token and send it to the interested children."""
+        self._propagate(fact, Token.valid(fact))
+
+    @instrumented('MATCHER', before=_log_bus('removed'))
     def remove(self, fact):
-        """Create an INVALID token and send it to all children."""
-        token = Token.invalid(fact)
-        MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
-            child.callback(token)
+        """Create an INVALID token and send it to the interested children."""
+        self._propagate(fact, Token.invalid(fact))
+
+    def modify(self, old_fact, new_fact, changed):
+        """
+        Replace `old_fact` by `new_fact`, which only differ in `changed`.
+
+        Both facts are sent down the alpha network together, so the
+        checks over fields not in `changed` are evaluated only once.
+
+        """
+        if type(old_fact) is not type(new_fact):
+            self.remove(old_fact)
+            self.add(new_fact)
+            return
+
+        old_token = Token.invalid(old_fact)
+        new_token = Token.valid(new_fact)
+        MATCHER.debug("<BusNode> modified %r -> %r", old_token, new_token)
+        _propagate_modify(self.typed_children.get(type(new_fact), ()),
+                          old_token, new_token, changed)
+        _propagate_modify(self.untyped_children,
+                          old_token, new_token, changed)
 
 
 class WhereNode(mixins.AnyChild,
@@ -103,34 +190,541 @@ class FeatureTesterNode(mixins.AnyChild,
         Activate this node.
 
         Test the given token with this token matcher function and iff
-        the test pass update the token and pass to all children.
+        the test pass extend the token context and pass to all children.
 
         """
+        token = self._extend(token, self.matcher(self._get_fact(token)))
+        if token is not None:
+            for child in self.children:
+                child.callback(token)
+
+    @staticmethod
+    def _get_fact(token):
         try:
             assert len(token.data) == 1
         except AssertionError as exc:
             raise ValueError(exc) from exc
         else:
-            fact = list(token.data)[0]
+            fact, = token.data
+            return fact
+
+    @staticmethod
+    def _extend(token, match):
+        """Return `token` extended with `match` or `None` if not passed."""
+        if not match:
+            return None
+
+        if isinstance(match, Mapping):
+            for key, value in match.items():
+                if isinstance(key, tuple):  # Negated condition
+                    if key[1] in token.context \
+                            and token.context[key[1]] == value:
+                        return None
+                else:
+                    if token.context.get(key, value) != value:
+                        return None
+                    if (False, key) in token.context \
+                            and token.context[(False, key)] == value:
+                        return None
+            token = token.extend(match)
+        return token
+
+    def _is_unaffected(self, changed):
+        """Return whether `changed` fields can't alter the check result."""
+        if isinstance(self.matcher, TypeCheck):
+            return True
+        elif isinstance(self.matcher, FeatureCheck):
+            field = self.matcher.field
+            return field is not None and field not in changed
+        else:
+            return False
 
-        match = self.matcher(fact)
+    def modify(self, old_token, new_token, changed):
+        """
+        Test the tokens of a modified fact and its replacement.
 
-        if match:
-            if isinstance(match, Mapping):
-                for key, value in match.items():
-                    if isinstance(key, tuple):  # Negated condition
-                        if key[1] in token.context \
-                                and token.context[key[1]] == value:
-                            return False
-                    else:
-                        if token.context.get(key, value) != value:
-                            return False
-                        if (False, key) in token.context \
-                                and token.context[(False, key)] == value:
-                            return False
-                token.context.update(match)
-            for child in self.children:
-                child.callback(token)
+        When the check doesn't read any of the `changed` fields it is
+        evaluated once and the result applied to both tokens.
+
+        """
+        if old_token is not None and new_token is not None \
+                and self._is_unaffected(changed):
+            match = self.matcher(self._get_fact(new_token))
+            old_token = self._extend(old_token, match)
+            new_token = self._extend(new_token, match)
+        else:
+            if old_token is not None:
+                old_token = self._extend(
+                    old_token, self.matcher(self._get_fact(old_token)))
+            if new_token is not None:
+                new_token = self._extend(
+                    new_token, self.matcher(self._get_fact(new_token)))
+
+        _propagate_modify(self.children, old_token, new_token, changed)
+
+
+class SwitchNode(mixins.NoMemory,
+                 OneInputNode):
+    """
+    Base class of the nodes grouping `FeatureTesterNode` children which
+    test the same field.
+
+    The node reads the field of the received fact once and activates
+    only the children which can pass their test with this value
+    (returned by `_get_children`).
+
+    The node is built with one of the `FeatureCheck` of the group, which
+    is used only to read the field from the facts.
+    """
+
+    def __init__(self, accessor):
+        self.accessor = accessor
+        self.what = accessor.what
+        super().__init__()
+
+    @abc.abstractmethod
+    def _get_children(self, token):  # pragma: no cover
+        """Return the children which can be activated by `token`."""
+        pass
+
+    def _activate(self, token):
+        for child in self._get_children(token):
+            child.callback(token)
+
+    def modify(self, old_token, new_token, changed):
+        """
+        Send the tokens of a modified fact to the branches they match.
+
+        If the field didn't change both tokens follow the same branch.
+
+        """
+        field = self.accessor.field
+        if old_token is None or new_token is None \
+                or field is None or field in changed:
+            if old_token is not None:
+                self._activate(old_token)
+            if new_token is not None:
+                self._activate(new_token)
+        else:
+            _propagate_modify(self._get_children(new_token),
+                              old_token, new_token, changed)
+
+    def __str__(self):  # pragma: no cover
+        return "%s: %s" % (self.__class__.__name__, self.what)
+
+
+class LiteralSwitchNode(SwitchNode):
+    """
+    Literal Switch Node.
+
+    Groups the `FeatureTesterNode` children testing the same field
+    against different literal values. The value of the field in the
+    received fact is looked up in a dictionary and only the children
+    testing this literal are activated.
+    """
+
+    def _init_children(self):
+        super()._init_children()
+        self.branches = dict()
+
+    def add_child(self, node, callback):
+        """Add the child to the branch of the literal it tests."""
+        child = mixins.ChildNode(node, callback)
+        self.children.append(child)
+        self.branches.setdefault(node.matcher.how.value, []).append(child)
+
+    def _get_children(self, token):
+        fact, = token.data
+
+        try:
+            value = self.accessor.get_value(fact)
+        except LookupError:
+            return ()
+
+        try:
+            return self.branches.get(value, ())
+        except TypeError:  # Unhashable value, test all the branches.
+            return self.children
+
+
+class RangeSwitchNode(SwitchNode):
+    """
+    Range Switch Node.
+
+    Groups the `FeatureTesterNode` children comparing the same field
+    with numeric bounds (`LT`, `LE`, `GT`, `GE` and `BETWEEN` from
+    `experta.operator`). The bounds are kept sorted, so the children
+    whose range can contain the value of the received fact are found
+    with a binary search instead of testing every child.
+
+    The selected children still run their own check, which takes care
+    of strict comparisons, bindings and values equal to a bound.
+    """
+
+    _LOWER = {op.gt, op.ge}
+    _UPPER = {op.lt, op.le}
+
+    @classmethod
+    def get_bounds(cls, check):
+        """
+        Return the `(lower, upper)` bounds tested by `check`.
+
+        `None` is used for a missing bound, and returned instead of the
+        tuple if the check can't be handled by this node.
+
+        """
+        how = check.how
+        if not isinstance(how, P) or not isinstance(how.match, Predicate):
+            return None
+
+        function, operands = how.match
+        if function in cls._LOWER:
+            bounds = (operands[0], None)
+        elif function in cls._UPPER:
+            bounds = (None, operands[0])
+        elif function is _between:
+            bounds = operands
+        else:
+            return None
+
+        for bound in bounds:
+            if bound is not None \
+                    and (not isinstance(bound, Real) or bound != bound):
+                return None  # Not a number or NaN.
+
+        return bounds
+
+    def _init_children(self):
+        super()._init_children()
+        # Sorted bounds with the children in the same position.
+        self.lower_bounds, self.lower_children = list(), list()
+        self.upper_bounds, self.upper_children = list(), list()
+        self.range_bounds, self.range_children = list(), list()
+
+    def add_child(self, node, callback):
+        """Add the child sorted by the bounds it tests."""
+        child = mixins.ChildNode(node, callback)
+        self.children.append(child)
+
+        lower, upper = self.get_bounds(node.matcher)
+        if upper is None:
+            bounds, children, key = (
+                self.lower_bounds, self.lower_children, lower)
+        elif lower is None:
+            bounds, children, key = (
+                self.upper_bounds, self.upper_children, upper)
+        else:
+            bounds, children, key = (
+                self.range_bounds, self.range_children, (lower, upper))
+
+        idx = bisect.bisect_right(bounds, key)
+        bounds.insert(idx, key)
+        children.insert(idx, child)
+
+    def _get_children(self, token):
+        fact, = token.data
+
+        try:
+            value = self.accessor.get_value(fact)
+        except LookupError:
+            return ()
+
+        if not isinstance(value, Real):
+            return self.children
+
+        children = self.lower_children[
+            :bisect.bisect_right(self.lower_bounds, value)]
+        children.extend(self.upper_children[
+            bisect.bisect_left(self.upper_bounds, value):])
+        for (lower, upper), child in zip(self.range_bounds,
+                                         self.range_children):
+            if lower > value:
+                break
+            elif upper >= value:
+                children.append(child)
+
+        return children
+
+
+class MembershipSwitchNode(SwitchNode):
+    """
+    Membership Switch Node.
+
+    Groups the `FeatureTesterNode` children testing the membership of
+    the same field: the field is one of a set of values
+    (`experta.utils.anyof`) or the field is a collection containing a
+    value (`experta.operator.CONTAINS`). The values are indexed in a
+    dictionary, so the children which can pass their test are found
+    with one lookup per value instead of testing every child.
+
+    The selected children still run their own check. Children with
+    unhashable values, and facts with values that can't be looked up
+    (like substrings of a string for `CONTAINS`), test every child.
+    """
+
+    _COLLECTIONS = (tuple, list, set, frozenset, Mapping)
+
+    @staticmethod
+    def get_kind(check):
+        """
+        Return the kind of membership test done by `check`, `'anyof'`
+        or `'contains'`, or `None` if it can't be handled by this node.
+
+        """
+        how = check.how
+        if not isinstance(how, P) or not isinstance(how.match, Predicate):
+            return None
+        elif how.match.function is _isin:
+            return 'anyof'
+        elif how.match.function is op.contains:
+            return 'contains'
+        else:
+            return None
+
+    def _init_children(self):
+        super()._init_children()
+        # value -> children, and children which can't be indexed.
+        self.anyof_index, self.anyof_children = dict(), list()
+        self.contains_index, self.contains_children = dict(), list()
+
+    @staticmethod
+    def _add_indexed(index, unindexed, values, child):
+        try:
+            for value in values:
+                children = index.setdefault(value, [])
+                if not children or children[-1] is not child:
+                    children.append(child)
+        except TypeError:  # Unhashable value.
+            unindexed.append(child)
+
+    def add_child(self, node, callback):
+        """Add the child to the index of the values it tests."""
+        child = mixins.ChildNode(node, callback)
+        self.children.append(child)
+
+        operands = node.matcher.how.match.operands
+        if self.get_kind(node.matcher) == 'anyof':
+            values, = operands
+            self._add_indexed(self.anyof_index, self.anyof_children,
+                              values, child)
+        else:
+            self._add_indexed(self.contains_index, self.contains_children,
+                              operands, child)
+
+    def _get_contains_children(self, value):
+        if isinstance(value, self._COLLECTIONS):
+            with suppress(TypeError):  # Unhashable item.
+                return list(chain.from_iterable(
+                    self.contains_index.get(item, ()) for item in value))
+
+        # The items of the value can't be looked up (i.e. a string,
+        # where `CONTAINS` tests substrings).
+        return chain.from_iterable(self.contains_index.values())
+
+    def _get_children(self, token):
+        fact, = token.data
+
+        try:
+            value = self.accessor.get_value(fact)
+        except LookupError:
+            return ()
+
+        children = list(self.anyof_children)
+        children.extend(self.contains_children)
+        try:
+            children.extend(self.anyof_index.get(value, ()))
+        except TypeError:  # Unhashable value, test all the children.
+            children.extend(chain.from_iterable(self.anyof_index.values()))
+
+        if self.contains_index:
+            children.extend(self._get_contains_children(value))
+
+        # A child can be reached through several values.
+        return list(dict.fromkeys(children))
+
+
+class PatternSwitchNode(SwitchNode):
+    """
+    Pattern Switch Node.
+
+    Groups the `FeatureTesterNode` children matching the same field
+    against string patterns (`REGEX`, `LIKE` and `ILIKE` from
+    `experta.operator`). The literal prefix of each pattern is stored in
+    a trie, so walking the trie with the value of the received fact
+    finds the children whose prefix matches without testing every
+    pattern.
+
+    The selected children still run their own check. Patterns without
+    a literal prefix are always selected, as are all the children when
+    the value is not a string.
+    """
+
+    _REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+    _LIKE_SPECIAL = frozenset('*?[')
+
+    @classmethod
+    def get_prefix(cls, check):
+        """
+        Return `(case_sensitive, prefix)` for the pattern of `check`, or
+        `None` if it can't be handled by this node.
+
+        The prefix is empty when the pattern doesn't start with literal
+        characters.
+
+        """
+        how = check.how
+        if not isinstance(how, P) or not isinstance(how.match, Predicate):
+            return None
+
+        function, operands = how.match
+        if function is _regex:
+            regex, = operands
+            pattern = regex.pattern
+            if not isinstance(pattern, str):
+                return None
+            elif regex.flags & (re.IGNORECASE | re.VERBOSE) \
+                    or '|' in pattern:
+                return (True, '')
+            else:
+                prefix = list()
+                for char in pattern.lstrip('^'):
+                    if char in cls._REGEX_SPECIAL:
+                        if char in '*?{' and prefix:
+                            prefix.pop()  # The last char is optional.
+                        break
+                    prefix.append(char)
+                return (True, ''.join(prefix))
+        elif function is _like or function is _ilike:
+            pattern, _ = operands
+            prefix = list()
+            for char in pattern:
+                if char in cls._LIKE_SPECIAL:
+                    break
+                prefix.append(char)
+            return (function is _like, ''.join(prefix))
+        else:
+            return None
+
+    def _init_children(self):
+        super()._init_children()
+        # Tries of nested dictionaries, the children are stored in the
+        # `None` key of the node at the end of their prefix.
+        self.case_trie = dict()
+        self.nocase_trie = dict()
+
+    def add_child(self, node, callback):
+        """Add the child to the trie under its pattern prefix."""
+        child = mixins.ChildNode(node, callback)
+        self.children.append(child)
+
+        case_sensitive, prefix = self.get_prefix(node.matcher)
+        trie = self.case_trie if case_sensitive else self.nocase_trie
+        for char in prefix:
+            trie = trie.setdefault(char, dict())
+        trie.setdefault(None, []).append(child)
+
+    @staticmethod
+    def _search(trie, value):
+        """Return the children of `trie` with a prefix of `value`."""
+        children = list(trie.get(None, ()))
+        for char in value:
+            trie = trie.get(char)
+            if trie is None:
+                break
+            children.extend(trie.get(None, ()))
+        return children
+
+    def _get_children(self, token):
+        fact, = token.data
+
+        try:
+            value = self.accessor.get_value(fact)
+        except LookupError:
+            return ()
+
+        if not isinstance(value, str):
+            return self.children
+
+        children = self._search(self.case_trie, value)
+        if self.nocase_trie:
+            children.extend(self._search(self.nocase_trie,
+                                         os.path.normcase(value.lower())))
+        return children
+
+
+class AlphaMemoryNode(OneInputNode):
+    """
+    Alpha Memory Node.
+
+    Stores the tokens arriving to the right input of the
+    `OrdinaryMatchNode` children, usually the end of an alpha branch.
+    The memory is shared by all of them, so it is updated once per
+    token instead of once per join.
+
+    Children with an empty left memory can't produce any match, so they
+    are unlinked (not activated) until a token arrives to their left
+    input. As the memory is kept up to date meanwhile nothing has to be
+    done to relink them.
+
+    Children are activated in the reverse order they were added. A join
+    is always added after its ancestors, so this visits a join before
+    the ones which may feed its left input and the shared memory
+    (already holding the token) isn't matched twice with the same
+    tokens.
+    """
+
+    def __init__(self, join_keys=()):
+        self.join_keys = tuple(join_keys)
+        super().__init__()
+
+    def _init_children(self):
+        super()._init_children()
+        # Nodes currently linked and their `ChildNode` in activation
+        # order.
+        self.linked_nodes = set()
+        self.linked = list()
+
+    def _reset(self):
+        self.memory = BetaMemory(self.join_keys)
+        for child in self.children:
+            child.node.right_memory = self.memory
+        self.linked_nodes = set()
+        self.linked = list()
+
+    def _copy_memory(self):
+        self.memory = self.memory.copy()
+
+    def add_child(self, node, callback):
+        """Add the child and make the memory its right memory."""
+        self.children.append(mixins.ChildNode(node, callback))
+        node.right_input = self
+        node.right_memory = self.memory
+        self.set_linked(node, bool(node.left_memory))
+
+    def set_linked(self, node, linked):
+        """Link or unlink the child `node`."""
+        if linked != (node in self.linked_nodes):
+            if linked:
+                self.linked_nodes.add(node)
+            else:
+                self.linked_nodes.discard(node)
+            # A new list, this one may be being iterated.
+            self.linked = [child for child in reversed(self.children)
+                           if child.node in self.linked_nodes]
+
+    def _activate(self, token):
+        info = token.to_info()
+        if token.is_valid():
+            self.memory.append(info, token.context)
+        else:
+            with suppress(ValueError):
+                self.memory.remove(info, token.context)
+
+        for child in self.linked:
+            child.callback(token)
+
+    def __str__(self):  # pragma: no cover
+        return "%s: %s" % (self.__class__.__name__, self.join_keys)
 
 
 class OrdinaryMatchNode(mixins.AnyChild,
@@ -150,84 +744,98 @@ class OrdinaryMatchNode(mixins.AnyChild,
     Matching pairs will be combined in one token containing facts from
     both and a combined context. This combined tokens will be sent to
     all children.
+
+    If `join_keys` are given both memories are indexed by the values of
+    these context keys (the variables shared by both sides), and only
+    the tokens with the same values are tested by the matching function.
+
+    When the right input is an `AlphaMemoryNode` (`self.right_input`)
+    its memory is used as the right memory of this node, and this node
+    is only right activated while its left memory isn't empty.
     """
 
+    def __init__(self, matcher, join_keys=()):
+        self.join_keys = tuple(join_keys)
+        self.right_input = None
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node memory."""
-        self.left_memory = list()
-        self.right_memory = list()
+        self.left_memory = BetaMemory(self.join_keys)
+        if self.right_input is None:
+            self.right_memory = BetaMemory(self.join_keys)
+        else:
+            self.right_memory = self.right_input.memory
+
+    def _copy_memory(self):
+        self.left_memory = self.left_memory.copy()
+        if self.right_input is None:
+            self.right_memory = self.right_memory.copy()
+
+    def __update_memory(self, token, branch_memory):
+        info = token.to_info()
+        if token.is_valid():
+            branch_memory.append(info, token.context)
+        else:
+            with suppress(ValueError):
+                branch_memory.remove(info, token.context)
+
+    def __join(self, token, other_data, other_context):
+        """Send to the children the join of `token` with the other side."""
+        newcontext = {k: v for k, v in token.context.items()
+                      if isinstance(k, str)}
+
+        for k, v in other_context.items():
+            if not isinstance(k, tuple):
+                # Negated value are not needed any further
+                newcontext[k] = v
+
+        newtoken = Token._make((token.tag,
+                                token.data | other_data,
+                                newcontext))
 
-    def __activation(self, token, branch_memory, matching_memory,
-                     is_left=True):
+        for child in self.children:
+            child.callback(newtoken)
+
+    def __activation(self, token, matching_memory, is_left=True):
         """
         Node activation internal function.
 
         This is a generalization of both activation functions.
 
-        The given token is added or removed from `branch_memory`
-        depending of its tag.
-
-        For any other data in `matching_memory` the match function will
-        be called and if a match occurs a new token will be produced and
-        sent to all children.
+        For any candidate data in `matching_memory` the match function
+        will be called and if a match occurs a new token will be produced
+        and sent to all children.
 
         """
-        if token.is_valid():
-            branch_memory.append(token.to_info())
-        else:
-            with suppress(ValueError):
-                branch_memory.remove(token.to_info())
+        if not matching_memory.size:  # Nothing to match with.
+            return
 
-        for other_data, other_context in matching_memory:
+        for other_data, other_context in matching_memory.candidates(
+                token.context):
             other_context = dict(other_context)
             if is_left:
-                left_context = token.context
-                right_context = other_context
+                match = self.matcher(token.context, other_context)
             else:
-                left_context = other_context
-                right_context = token.context
-
-            match = self.matcher(left_context, right_context)
+                match = self.matcher(other_context, token.context)
 
             if match:
-                MATCH.info("%s (%s | %s) = True",
-                           self.__class__.__name__,
-                           left_context,
-                           right_context)
-
-                newcontext = {k: v for k, v in token.context.items()
-                              if isinstance(k, str)}
-
-                for k, v in other_context.items():
-                    if not isinstance(k, tuple):
-                        # Negated value are not needed any further
-                        newcontext[k] = v
-
-                newtoken = Token(token.tag,
-                                 token.data | other_data,
-                                 newcontext)
-
-                for child in self.children:
-                    child.callback(newtoken)
-            else:
-                MATCH.debug("%s (%s | %s) = False",
-                            self.__class__.__name__,
-                            left_context,
-                            right_context)
+                self.__join(token, other_data, other_context)
 
     def _activate_left(self, token):
         """Node left activation."""
-        self.__activation(token,
-                          self.left_memory,
-                          self.right_memory,
-                          is_left=True)
+        self.__update_memory(token, self.left_memory)
+        if self.right_input is not None and self.left_memory.size <= 1:
+            self.right_input.set_linked(self, bool(self.left_memory.size))
+
+        self.__activation(token, self.right_memory, is_left=True)
 
     def _activate_right(self, token):
         """Node right activation."""
-        self.__activation(token,
-                          self.right_memory,
-                          self.left_memory,
-                          is_left=False)
+        if self.right_input is None:
+            self.__update_memory(token, self.right_memory)
+
+        self.__activation(token, self.left_memory, is_left=False)
 
 
 class ConflictSetNode(mixins.AnyChild,
@@ -239,6 +847,13 @@ class ConflictSetNode(mixins.AnyChild,
     this node will produce an activation (VALID token) or deactivation
     (INVALID token) of the internal `rule` with the token context and
     facts.
+
+    If `changed_nodes` is set to a mapping, the node adds itself to it
+    on every activation, so the matcher knows which nodes to drain.
+
+    An activation removed and matched again before the changes are
+    drained cancels out. The cancelled pairs are kept in `refreshed`
+    until then, so they can be reported with `refresh` instead.
     """
 
     def __init__(self, rule):
@@ -250,48 +865,80 @@ class ConflictSetNode(mixins.AnyChild,
         else:
             self.rule = rule
 
-        self.added = set()
-        self.removed = set()
+        self.changed_nodes = None
 
         super().__init__()
 
     def _reset(self):
-        """Wipe the node internal memory."""
+        """Wipe the node internal memory and its pending changes."""
         self.memory = set()
+        self.added = dict()
+        self.removed = dict()
+        self.refreshed = dict()
+
+    def _copy_memory(self):
+        self.memory = self.memory.copy()
+        self.added = self.added.copy()
+        self.removed = self.removed.copy()
+        self.refreshed = self.refreshed.copy()
+        self.changed_nodes = None
+
+    def _get_activation(self, info):
+        return Activation(
+            self.rule,
+            info.data,
+            {k: v for k, v in info.context if isinstance(k, str)})
 
     def _activate(self, token):
-        """Activate this node for the given token."""
-        info = token.to_info()
+        """
+        Activate this node for the given token.
 
-        activation = Activation(
-            self.rule,
-            frozenset(info.data),
-            {k: v for k, v in info.context if isinstance(k, str)})
+        Pending changes are indexed by `TokenInfo`, so the activation is
+        only built when a change is recorded.
+
+        """
+        if self.changed_nodes is not None:
+            self.changed_nodes[self] = None
+
+        info = token.to_info()
 
         if token.is_valid():
             if info not in self.memory:
                 self.memory.add(info)
-                if activation in self.removed:
-                    self.removed.remove(activation)
+                if info in self.removed:
+                    self.refreshed[info] = self.removed.pop(info)
                 else:
-                    self.added.add(activation)
+                    self.added[info] = self._get_activation(info)
         else:
             try:
                 self.memory.remove(info)
-            except ValueError:
+            except KeyError:
                 pass
             else:
-                if activation in self.added:
-                    self.added.remove(activation)
+                if info in self.added:
+                    del self.added[info]
+                elif info in self.refreshed:
+                    self.removed[info] = self.refreshed.pop(info)
                 else:
-                    self.removed.add(activation)
+                    self.removed[info] = self._get_activation(info)
+
+    def refresh(self):
+        """
+        Report the cancelled pairs as a removed activation and a new
+        one, as if the changes had been drained in between.
+        """
+        for info, activation in self.refreshed.items():
+            self.removed[info] = activation
+            self.added[info] = self._get_activation(info)
+        self.refreshed = dict()
 
     def get_activations(self):
         """Return a list of activations."""
-        res = (self.added, self.removed)
+        res = (list(self.added.values()), list(self.removed.values()))
 
-        self.added = set()
-        self.removed = set()
+        self.added = dict()
+        self.removed = dict()
+        self.refreshed = dict()
 
         return res
 
@@ -314,10 +961,22 @@ class NotNode(mixins.AnyChild,
     INVALID tokens when they are.
     """
 
+    def __init__(self, matcher, join_keys=()):
+        self.join_keys = tuple(join_keys)
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node internal memory."""
         self.left_memory = dict()
-        self.right_memory = list()
+        self.right_memory = BetaMemory(self.join_keys)
+        if self.join_keys:
+            self.left_index = BetaMemory(self.join_keys)
+
+    def _copy_memory(self):
+        self.left_memory = self.left_memory.copy()
+        self.right_memory = self.right_memory.copy()
+        if self.join_keys:
+            self.left_index = self.left_index.copy()
 
     def _activate_left(self, token):
         """
@@ -328,42 +987,33 @@ class NotNode(mixins.AnyChild,
         token and the number of occurences are stored in the left
         memory.
 
+        In case of an invalid token the stored number of matches is
+        used to decide if the token must be propagated.
+
         If the number of matches is zero the token activates all children.
 
         """
-        if not self.right_memory:
-            if token.is_valid():
-                self.left_memory[token.to_info()] = 0
-            else:
-                del self.left_memory[token.to_info()]
-
-            for child in self.children:
-                child.callback(token)
+        info = token.to_info()
 
-        elif token.is_valid():
+        if token.is_valid():
             count = 0
-
-            for _, right_context in self.right_memory:
-                if self.matcher(token.context, dict(right_context)):
-                    count += 1
-
-            if count == 0:
-                for child in self.children:
-                    child.callback(token)
-
-            self.left_memory[token.to_info()] = count
+            if self.right_memory:
+                for _, right_context in self.right_memory.candidates(
+                        token.context):
+                    if self.matcher(token.context, dict(right_context)):
+                        count += 1
+
+            if self.join_keys and info not in self.left_memory:
+                self.left_index.append(info, token.context)
+            self.left_memory[info] = count
         else:
-            count = 0
-            for _, right_context in self.right_memory:
-                if self.matcher(token.context, dict(right_context)):
-                    count += 1
-                    break
-
-            if count == 0:
-                for child in self.children:
-                    child.callback(token)
+            count = self.left_memory.pop(info)
+            if self.join_keys:
+                self.left_index.remove(info, token.context)
 
-            del self.left_memory[token.to_info()]
+        if count == 0:
+            for child in self.children:
+                child.callback(token)
 
     def _activate_right(self, token):
         """
@@ -374,15 +1024,26 @@ class NotNode(mixins.AnyChild,
         and adding otherwise). Depending on the result of this operation
         a new token is generated and passing to all children.
 
+        When the node has `join_keys` only the left tokens sharing the
+        values of these keys with the given token are visited.
+
         """
         if token.is_valid():
-            self.right_memory.append(token.to_info())
+            self.right_memory.append(token.to_info(), token.context)
             inc = 1
         else:
             inc = -1
-            self.right_memory.remove(token.to_info())
+            self.right_memory.remove(token.to_info(), token.context)
+
+        if not self.left_memory:  # Nothing to match with.
+            return
+
+        if self.join_keys:
+            lefts = self.left_index.candidates(token.context)
+        else:
+            lefts = self.left_memory
 
-        for left in self.left_memory:
+        for left in lefts:
             if self.matcher(dict(left.context), token.context):
                 self.left_memory[left] += inc
                 newcount = self.left_memory[left]
@@ -0,0 +1,174 @@
+"""
+On disk cache of compiled RETE networks.
+
+A compiled network is pickled from the template built by
+`ReteMatcher.compile_network`. Nodes, checks and prepared rules are
+stored by value. The functions and fact classes used by the rules
+(right hand sides, predicates, tests...) cannot always be pickled, so
+they are stored as a reference to their position inside the rules of
+the engine class and taken from the class when the network is loaded.
+
+Networks are stored under a key computed from the rule definitions, so
+changing a rule makes the cache miss and the network is compiled again.
+
+"""
+from types import FunctionType
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+
+import experta
+from experta.fact import Fact
+from experta.rule import Rule
+from experta.watchers import MATCHER
+
+
+def _collect_references(obj, path, references):
+    """Add to `references` the objects of `obj` not pickled by value."""
+    if isinstance(obj, Fact):
+        references.setdefault(path + ('__class__', ), type(obj))
+        for key, value in obj.items():
+            _collect_references(value, path + (key, ), references)
+    elif isinstance(obj, tuple):
+        for idx, value in enumerate(obj):
+            _collect_references(value, path + (idx, ), references)
+    elif isinstance(obj, type) or callable(obj):
+        references.setdefault(path, obj)
+
+
+def get_references(engine_class):
+    """
+    Return a dictionary of path -> object with the functions and fact
+    classes used by the rules of `engine_class`.
+
+    """
+    references = dict()
+    for name in engine_class._get_member_names(Rule):
+        rule = inspect.getattr_static(engine_class, name)
+        if rule._wrapped is not None:
+            references[(name, 'rhs')] = rule._wrapped
+        _collect_references(rule, (name, ), references)
+    return references
+
+
+def _fingerprint(obj, digest):
+    """Feed `digest` with a description of `obj` stable across runs."""
+    if isinstance(obj, FunctionType):
+        digest.update(b'function')
+        digest.update(marshal.dumps(obj.__code__))
+    elif isinstance(obj, type):
+        digest.update(('type %s.%s' % (obj.__module__,
+                                       obj.__qualname__)).encode())
+    elif isinstance(obj, Fact):
+        _fingerprint(type(obj), digest)
+        digest.update(repr(getattr(obj, '__bind__', None)).encode())
+        for key in sorted(obj, key=repr):
+            digest.update(repr(key).encode())
+            _fingerprint(obj[key], digest)
+        digest.update(b'end')
+    elif isinstance(obj, tuple):
+        _fingerprint(type(obj), digest)
+        digest.update(repr(getattr(obj, '__bind__', None)).encode())
+        for value in obj:
+            _fingerprint(value, digest)
+        digest.update(b'end')
+    else:
+        digest.update(repr(obj).encode())
+
+
+def get_key(engine_class, matcher_class):
+    """Return the cache key for the network of `engine_class`."""
+    digest = hashlib.sha256()
+    reorder_joins = getattr(matcher_class, 'reorder_joins', False)
+    digest.update(repr((experta.__version__,
+                        sys.version_info[:2],
+                        matcher_class.__module__,
+                        matcher_class.__qualname__,
+                        reorder_joins)).encode())
+    for name in engine_class._get_member_names(Rule):
+        rule = inspect.getattr_static(engine_class, name)
+        digest.update(repr((name, rule.salience)).encode())
+        _fingerprint(rule, digest)
+    return digest.hexdigest()
+
+
+class _NetworkPickler(pickle.Pickler):
+    def __init__(self, file, references):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.paths = {id(obj): path for path, obj in references.items()}
+
+    def persistent_id(self, obj):
+        return self.paths.get(id(obj))
+
+
+class _NetworkUnpickler(pickle.Unpickler):
+    def __init__(self, file, references):
+        super().__init__(file)
+        self.references = references
+
+    def persistent_load(self, pid):
+        try:
+            return self.references[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(
+                "Unknown reference %r" % (pid, )) from None
+
+
+class NetworkCache:
+    """
+    Directory where compiled networks are stored.
+
+    Set an instance as the `network_cache` of a `ReteMatcher` subclass
+    and use it as the `__matcher__` of the engine::
+
+        >>> class CachedMatcher(ReteMatcher):
+        ...     network_cache = NetworkCache('/var/cache/experta')
+        >>> class MyEngine(KnowledgeEngine):
+        ...     __matcher__ = CachedMatcher
+
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def load(self, engine_class, matcher_class):
+        """Return the stored network root node or `None`."""
+        path = self.get_path(get_key(engine_class, matcher_class))
+        try:
+            with open(path, 'rb') as file:
+                return _NetworkUnpickler(
+                    file, get_references(engine_class)).load()
+        except FileNotFoundError:
+            return None
+        except Exception as exc:  # Corrupted or outdated file.
+            MATCHER.warning("Can't load network from %s: %r", path, exc)
+            return None
+
+    def save(self, engine_class, matcher_class, root_node):
+        """
+        Store the network starting at `root_node`.
+
+        Return whether it could be stored.
+
+        """
+        path = self.get_path(get_key(engine_class, matcher_class))
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                _NetworkPickler(
+                    file, get_references(engine_class)).dump(root_node)
+            os.replace(tmppath, path)
+        except Exception as exc:
+            MATCHER.warning("Can't store network in %s: %r", path, exc)
+            os.unlink(tmppath)
+            return False
+        else:
+            return True
@@ -26,7 +26,14 @@ class TokenInfo(namedtuple('_TokenInfo', ['data', 'context'])):
 
 
 class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
-    """Token, as described by RETE but with context."""
+    """
+    Token, as described by RETE but with context.
+
+    Tokens are shared by all the nodes they pass through, so neither
+    `data` nor `context` should be modified once the token is built.
+    Use `extend` to get a token with more context.
+
+    """
 
     class TagType(Enum):
         """Types of Token TAG data."""
@@ -86,6 +93,18 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         """Test if this Token is VALID."""
         return self.tag == self.TagType.VALID
 
+    def extend(self, context):
+        """
+        Return a new token with this token context updated by `context`.
+
+        The data is shared with this token and the type checks of
+        `__new__` are skipped, as this token was already checked.
+
+        """
+        newcontext = self.context.copy()
+        newcontext.update(context)
+        return self._make((self.tag, self.data, newcontext))
+
     def copy(self):
         """
         Make a new instance of this Token.
@@ -3,10 +3,12 @@ from functools import singledispatch
 from .check import FeatureCheck, TypeCheck, FactCapture, SameContextCheck
 from .check import WhereCheck
 from .dnf import dnf
-from .nodes import ConflictSetNode, NotNode, OrdinaryMatchNode
-from .nodes import WhereNode
+from .nodes import AlphaMemoryNode, ConflictSetNode, NotNode
+from .nodes import OrdinaryMatchNode, WhereNode
 from experta.conditionalelement import NOT, OR, AND, TEST, EXISTS, FORALL
 from experta.fact import InitialFact, Fact
+from experta.fieldconstraint import FieldConstraint, L, W
+from experta.fieldconstraint import ANDFC, ORFC, NOTFC
 from experta.rule import Rule
 
 
@@ -80,6 +82,149 @@ def extract_facts(rule):
     return set(_extract_facts(rule))
 
 
+@singledispatch
+def extract_bound_variables(elem):
+    """
+    Given a rule element, return the set of variable names that are
+    always present in the context of the tokens matching it.
+
+    """
+    return set()
+
+
+@extract_bound_variables.register(Fact)
+def _(elem):
+    variables = set()
+    for key, value in elem.items():
+        if key == '__bind__':
+            variables.add(value)
+        elif isinstance(value, FieldConstraint):
+            variables |= extract_bound_variables(value)
+    return variables
+
+
+@extract_bound_variables.register(FieldConstraint)
+def _(elem):
+    bind = getattr(elem, '__bind__', None)
+    return set() if bind is None else {bind}
+
+
+@extract_bound_variables.register(ANDFC)
+def _(elem):
+    return set().union(*(extract_bound_variables(e) for e in elem))
+
+
+@extract_bound_variables.register(ORFC)
+def _(elem):
+    # Only the variables bound by every alternative are guaranteed.
+    return set.intersection(*(extract_bound_variables(e) for e in elem))
+
+
+@extract_bound_variables.register(NOTFC)
+def _(elem):
+    return set()
+
+
+@singledispatch
+def estimate_selectivity(elem):
+    """
+    Given a pattern or a field constraint, return a rough estimation of
+    how restrictive it is. Patterns with a greater value are expected to
+    match fewer facts.
+
+    """
+    return 2  # A literal value.
+
+
+@estimate_selectivity.register(Fact)
+def _(elem):
+    return sum(estimate_selectivity(value)
+               for key, value in elem.items()
+               if not (isinstance(key, str)
+                       and key.startswith('__')
+                       and key.endswith('__')))
+
+
+@estimate_selectivity.register(L)
+def _(elem):
+    return 2
+
+
+@estimate_selectivity.register(W)
+def _(elem):
+    return 0
+
+
+@estimate_selectivity.register(FieldConstraint)
+def _(elem):
+    return 1
+
+
+@estimate_selectivity.register(ANDFC)
+def _(elem):
+    return sum(estimate_selectivity(e) for e in elem)
+
+
+@estimate_selectivity.register(ORFC)
+def _(elem):
+    return min(estimate_selectivity(e) for e in elem)
+
+
+def has_negated_variables(elem):
+    """Return whether the pattern `elem` tests a negated variable."""
+    if isinstance(elem, Fact):
+        return any(has_negated_variables(value) for value in elem.values())
+    elif isinstance(elem, NOTFC):
+        return bool(extract_bound_variables(elem[0]))
+    elif isinstance(elem, (ANDFC, ORFC)):
+        return any(has_negated_variables(e) for e in elem)
+    else:
+        return False
+
+
+def order_joins(elems):
+    """
+    Return the elements of a conjunction in the order they should be
+    joined, with the most selective patterns first.
+
+    Only runs of consecutive positive patterns are reordered. `NOT`,
+    `TEST` and the other conditional elements, and the patterns testing
+    negated variables, keep their position relative to the rest of the
+    patterns so they see the same variables. Inside a run the patterns
+    sharing variables with the ones already joined go first, to avoid
+    cross products, and then the most selective ones. Ties keep the
+    written order.
+
+    """
+    ordered = list()
+    bound = set()
+    run = list()
+
+    def flush_run():
+        while run:
+            best = max(
+                enumerate(run),
+                key=lambda item: (
+                    bool(bound & extract_bound_variables(item[1])),
+                    estimate_selectivity(item[1]),
+                    -item[0]))[1]
+            run.remove(best)
+            ordered.append(best)
+            bound.update(extract_bound_variables(best))
+
+    for elem in elems:
+        if isinstance(elem, Fact) and not has_negated_variables(elem):
+            run.append(elem)
+        else:
+            flush_run()
+            ordered.append(elem)
+            if isinstance(elem, Fact):
+                bound.update(extract_bound_variables(elem))
+    flush_run()
+
+    return ordered
+
+
 def generate_checks(fact):
     """Given a fact, generate a list of Check objects for checking it."""
 
@@ -104,10 +249,62 @@ def generate_checks(fact):
         yield FactCapture("__pattern_%s__" % id(fact))
 
 
-def wire_rule(rule, alpha_terminals, lhs=None):
+def wire_rule(rule, alpha_terminals, lhs=None, reorder_joins=False,
+              shared_nodes=None):
+    """
+    Build the beta network of `rule` (or of its `lhs` part) from the
+    `alpha_terminals` of its patterns.
+
+    If `reorder_joins` is true the patterns are joined in the order
+    given by `order_joins` instead of the written one.
+
+    `shared_nodes` maps the inputs and test of the beta nodes already
+    built to the node. Passing the same dictionary for several rules
+    makes them share the nodes (and their memories) of the common part
+    of their LHS.
+
+    """
     if lhs is None:
         lhs = rule
 
+    if shared_nodes is None:
+        shared_nodes = dict()
+
+    def _join(node_cls, left_branch, right_branch, join_keys=()):
+        """Return the node joining both branches, creating it if needed."""
+        key = (node_cls, left_branch, right_branch, tuple(join_keys))
+        try:
+            return shared_nodes[key]
+        except KeyError:
+            node = shared_nodes[key] = node_cls(SameContextCheck(),
+                                                join_keys)
+
+        if node_cls is OrdinaryMatchNode:
+            # The joins with the same right input share its memory.
+            memory_key = (AlphaMemoryNode, right_branch, tuple(join_keys))
+            try:
+                memory_node = shared_nodes[memory_key]
+            except KeyError:
+                memory_node = shared_nodes[memory_key] = AlphaMemoryNode(
+                    join_keys)
+                right_branch.add_child(memory_node, memory_node.activate)
+            right_branch = memory_node
+
+        left_branch.add_child(node, node.activate_left)
+        right_branch.add_child(node, node.activate_right)
+        return node
+
+    def _test(parent, elem):
+        """Return the node testing `elem` after `parent`."""
+        check = WhereCheck(elem[0])
+        key = (WhereNode, parent, check)
+        try:
+            return shared_nodes[key]
+        except KeyError:
+            node = shared_nodes[key] = WhereNode(check)
+            parent.add_child(node, node.activate)
+            return node
+
     @singledispatch
     def _wire_rule(elem):
         raise TypeError("Unknown type %s" % type(elem))
@@ -124,36 +321,18 @@ def wire_rule(rule, alpha_terminals, lhs=None):
         initial_fact_node = _wire_rule(InitialFact())
         leader_node = _wire_rule(leader)
         followers_node = _wire_rule(AND(*followers))
-        not_node_1 = NotNode(SameContextCheck())
-        not_node_2 = NotNode(SameContextCheck())
-
-        # NotNode1
-        followers_node.add_child(not_node_1, not_node_1.activate_right)
-        leader_node.add_child(not_node_1, not_node_1.activate_left)
 
-        # NotNode2
-        not_node_1.add_child(not_node_2, not_node_2.activate_right)
-        initial_fact_node.add_child(not_node_2, not_node_2.activate_left)
-
-        return not_node_2
+        not_node_1 = _join(NotNode, leader_node, followers_node)
+        return _join(NotNode, initial_fact_node, not_node_1)
 
     @_wire_rule.register(EXISTS)
     def _(elem):
         # Create new nodes
         condition_node = _wire_rule(elem[0])
         initial_fact_node = _wire_rule(InitialFact())
-        not_node_1 = NotNode(SameContextCheck())
-        not_node_2 = NotNode(SameContextCheck())
-
-        # NotNode1
-        condition_node.add_child(not_node_1, not_node_1.activate_right)
-        initial_fact_node.add_child(not_node_1, not_node_1.activate_left)
 
-        # NotNode2
-        initial_fact_node.add_child(not_node_2, not_node_2.activate_left)
-        not_node_1.add_child(not_node_2, not_node_2.activate_right)
-
-        return not_node_2
+        not_node_1 = _join(NotNode, initial_fact_node, condition_node)
+        return _join(NotNode, initial_fact_node, not_node_1)
 
     @_wire_rule.register(Rule)
     @_wire_rule.register(AND)
@@ -164,35 +343,38 @@ def wire_rule(rule, alpha_terminals, lhs=None):
             else:
                 return _wire_rule(elem[0])
         else:  # > 1. Because < 1 is not possible at this point.
+            if reorder_joins:
+                elem = order_joins(elem)
+
             current_node = None
+            bound = extract_bound_variables(elem[0])
             for f, s in zip(elem, elem[1:]):
                 if isinstance(s, TEST):
                     if current_node is None:
                         current_node = _wire_rule(f)
 
                     # A TestNode after the previous node
-                    new_node = _wire_rule(s)
-                    current_node.add_child(new_node, new_node.activate)
-                    current_node = new_node
+                    current_node = _test(current_node, s)
                 else:
                     if isinstance(s, NOT):
                         node_cls = NotNode
+                        right_bound = extract_bound_variables(s[0])
                     else:
                         node_cls = OrdinaryMatchNode
+                        right_bound = extract_bound_variables(s)
+
+                    # Negated patterns don't add bindings to the token.
+                    join_keys = sorted(bound & right_bound)
+                    if node_cls is OrdinaryMatchNode:
+                        bound |= right_bound
 
                     if current_node is None:
-                        current_node = node_cls(SameContextCheck())
                         left_branch = _wire_rule(f)
-                        right_branch = _wire_rule(s)
                     else:
                         left_branch = current_node
-                        right_branch = _wire_rule(s)
-                        current_node = node_cls(SameContextCheck())
 
-                    left_branch.add_child(current_node,
-                                          current_node.activate_left)
-                    right_branch.add_child(current_node,
-                                           current_node.activate_right)
+                    current_node = _join(node_cls, left_branch,
+                                         _wire_rule(s), join_keys)
             return current_node
 
     @_wire_rule.register(OR)
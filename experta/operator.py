@@ -25,9 +25,16 @@ Example:
 ...     pass
 ...
 
+Operators build :py:class:`Predicate` objects instead of anonymous
+functions, so the same constraint written in several rules (``GE(0)``
+over the same field, for example) is recognized as such and tested only
+once by the matcher.
+
 """
+from collections import namedtuple
 from itertools import chain
 import operator as op
+import os
 import re
 import fnmatch
 
@@ -38,19 +45,80 @@ __all__ = ['TRUTH', 'LT', 'LE', 'EQ', 'NE', 'GE', 'GT', 'IS', 'IS_NOT',
            'CONTAINS', 'BETWEEN', 'CALL', 'REGEX', 'LIKE', 'ILIKE']
 
 
+#: Operands compared by type and value in `Predicate`.
+_SCALARS = (type(None), bool, int, float, complex, str, bytes, re.Pattern)
+
+
+def _operand_key(operand):
+    """
+    Return the key used to compare `operand` in `Predicate`.
+
+    Scalars are compared by type and value, tuples and frozensets by
+    their items and anything else by identity.
+
+    """
+    if type(operand) in _SCALARS:
+        return (type(operand), operand)
+    elif type(operand) is tuple:
+        return (tuple, tuple(_operand_key(o) for o in operand))
+    elif type(operand) is frozenset:
+        return (frozenset, frozenset(_operand_key(o) for o in operand))
+    else:
+        return ('ID', id(operand))
+
+
+class Predicate(namedtuple('_Predicate', ['function', 'operands'])):
+    """
+    Predicate testing ``function(value, *operands)``.
+
+    Predicates with the same function and operands are equal and have
+    the same hash, which lets the matcher share their checks. Operands
+    that compare equal but have different types (``1`` and ``True``,
+    even inside a tuple) are told apart, other objects are compared by
+    identity, as are the operands of identity tests (``IS``,
+    ``IS_NOT``).
+
+    """
+    def __call__(self, value):
+        return self.function(value, *self.operands)
+
+    def _key(self):
+        if self.function is op.is_ or self.function is op.is_not:
+            operands = tuple(('ID', id(o)) for o in self.operands)
+        else:
+            operands = tuple(_operand_key(o) for o in self.operands)
+        return (self.function, operands)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%s)" % (getattr(self.function, '__name__', self.function),
+                           ", ".join(repr(o) for o in self.operands))
+
+
+def _check_operands(operands):
+    if any(isinstance(x, ConditionalElement) for x in operands):
+        raise TypeError(
+            "A ConditionalElement can't be used as an operator condition.")
+
+
 def _from_operator2(o):
     def __from_operator2(b):
-        if isinstance(b, ConditionalElement):
-            raise TypeError(
-                "A ConditionalElement can't be used as an operator condition.")
-        else:
-            return P(lambda a: o(a, b))
+        _check_operands((b, ))
+        return P(Predicate(o, (b, )))
     return __from_operator2
 
 
 #: Return True if obj is true, and False otherwise. This is equivalent to using
 #: the bool constructor.
-TRUTH = P(bool)
+TRUTH = P(Predicate(bool, ()))
 
 #: Less than operator.
 LT = _from_operator2(op.lt)
@@ -80,17 +148,22 @@ IS_NOT = _from_operator2(op.is_not)
 CONTAINS = _from_operator2(op.contains)
 
 
+def _between(x, a, b):
+    return a <= x <= b
+
+
 def BETWEEN(a, b):
     """
     The BETWEEN operator selects values within a given range.
     The BETWEEN operator is inclusive: begin and end values are included.
 
     """
-    if any((isinstance(x, ConditionalElement) for x in (a, b))):
-        raise TypeError(
-            "A ConditionalElement can't be used as an operator condition.")
-    else:
-        return P(lambda x: a <= x <= b)
+    _check_operands((a, b))
+    return P(Predicate(_between, (a, b)))
+
+
+def _call_method(x, name, args, kwargs):
+    return getattr(x, name)(*args, **dict(kwargs))
 
 
 class _CALL:
@@ -111,29 +184,40 @@ class _CALL:
     """
     def __getattr__(self, name):
         def _call(*args, **kwargs):
-            if any((isinstance(x, ConditionalElement)
-                    for x in chain(args, kwargs.values()))):
-                raise TypeError(
-                    ("A ConditionalElement can't be used as an "
-                     "operator condition."))
-            else:
-                return P(lambda x: getattr(x, name)(*args, **kwargs))
+            _check_operands(tuple(chain(args, kwargs.values())))
+            return P(Predicate(_call_method,
+                               (name, args, tuple(sorted(kwargs.items())))))
         return _call
 
 
 CALL = _CALL()
 
 
+def _regex(x, regex):
+    return regex.match(x)
+
+
 def REGEX(pattern, flags=0):
     """Regular expression matching."""
-    return P(lambda x: re.match(pattern, x, flags=flags))
+    return P(Predicate(_regex, (re.compile(pattern, flags=flags), )))
+
+
+def _like(x, pattern, regex):
+    return regex.match(x) is not None
 
 
 def LIKE(pattern):
     """Unix shell-style wildcards. Case-sensitive"""
-    return P(lambda x: fnmatch.fnmatchcase(x, pattern))
+    return P(Predicate(_like,
+                       (pattern, re.compile(fnmatch.translate(pattern)))))
+
+
+def _ilike(x, pattern, regex):
+    return regex.match(os.path.normcase(x.lower())) is not None
 
 
 def ILIKE(pattern):
     """Unix shell-style wildcards. Case-insensitive"""
-    return P(lambda x: fnmatch.fnmatch(x.lower(), pattern.lower()))
+    pattern = os.path.normcase(pattern.lower())
+    return P(Predicate(_ilike,
+                       (pattern, re.compile(fnmatch.translate(pattern)))))
@@ -4,6 +4,7 @@ import collections.abc
 from frozendict import frozendict
 
 from .fieldconstraint import P
+from .operator import Predicate
 
 
 class frozenlist(tuple):
@@ -63,5 +64,9 @@ def unfreeze_frozenset(obj):
     return {unfreeze(x) for x in obj}
 
 
+def _isin(value, what):
+    return value in what
+
+
 def anyof(*what):
-    return P(lambda y: y in what)
+    return P(Predicate(_isin, (what, )))
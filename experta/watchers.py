@@ -7,18 +7,85 @@ Here, we expose a rule, fact and agenda watchers as
 well as a method to enable/disable them both individually
 and all of them.
 
+The matcher hot paths only contain log calls while the `MATCH` and
+`MATCHER` watchers are enabled with `watch`; configuring the loggers
+by other means doesn't enable them.
+
 """
 import logging
+import types
 
 __all__ = ['watch', 'unwatch']
 
 logging.basicConfig()
 
+# (watcher name, level, function, plain variant, logging variant), the
+# variants being (code, defaults, kwdefaults) tuples.
+_INSTRUMENTED = list()
+
 
 def define_watcher(name):
     return logging.getLogger('.'.join((__name__, name)))
 
 
+def instrumented(what, level_name='DEBUG', before=None, after=None):
+    """
+    Log the calls of the decorated function while the watcher `what` is
+    enabled for `level_name` (the highest level the hooks log at) with
+    `watch`.
+
+    `before` is called with the arguments of every call before running
+    it, and `after` with the result followed by the arguments. While the
+    watcher is disabled the function runs its own code, so the inner
+    loops don't pay for disabled log calls.
+
+    The code is replaced in the function object itself, so it works for
+    the methods already bound. The function can't use free variables.
+
+    """
+    def _instrumented(function):
+        if function.__closure__ is not None:
+            raise TypeError("Can't instrument a function with free variables")
+
+        original = types.FunctionType(function.__code__,
+                                      function.__globals__,
+                                      function.__name__,
+                                      function.__defaults__)
+        original.__kwdefaults__ = function.__kwdefaults__
+
+        plain = (function.__code__,
+                 function.__defaults__,
+                 function.__kwdefaults__)
+        logged = (_logged_call.__code__,
+                  None,
+                  {'_instrumentation': (original, before, after)})
+
+        _INSTRUMENTED.append((what, level_name, function, plain, logged))
+        _update_instrumentation()
+        return function
+    return _instrumented
+
+
+def _logged_call(*args, _instrumentation, **kwargs):
+    """Code of the instrumented functions while their watcher is enabled."""
+    function, before, after = _instrumentation
+    if before is not None:
+        before(*args, **kwargs)
+    result = function(*args, **kwargs)
+    if after is not None:
+        after(result, *args, **kwargs)
+    return result
+
+
+def _update_instrumentation():
+    for what, level_name, function, plain, logged in _INSTRUMENTED:
+        variant = logged if worth(what, level_name) else plain
+        code, defaults, kwdefaults = variant
+        function.__defaults__ = defaults
+        function.__kwdefaults__ = kwdefaults
+        function.__code__ = code
+
+
 def worth(what, level_name):
     """Returns `True` if the watcher `what` would log under `level_name`."""
     return (logging.NOTSET
@@ -41,6 +108,8 @@ def watch(*what, level=logging.DEBUG):
         watcher = globals()[watcher_name]
         watcher.setLevel(level)
 
+    _update_instrumentation()
+
 
 def unwatch(*what):
     """
@@ -61,4 +130,5 @@ MATCH = define_watcher('MATCH')
 MATCHER = define_watcher('MATCHER')
 ENGINE = define_watcher('ENGINE')
 
-ALL = tuple(k for k in globals() if k.isupper() and k != 'ALL')
+ALL = tuple(k for k in globals()
+            if k.isupper() and not k.startswith('_') and k != 'ALL')
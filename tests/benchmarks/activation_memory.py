@@ -0,0 +1,58 @@
+"""
+Memory stability benchmark.
+
+Fire a big number of activations through a single engine and report
+the traced memory after each batch. The figures must stay flat: any
+growth means some structure is keeping references to old activations
+or facts.
+
+Usage::
+
+    python tests/benchmarks/activation_memory.py [ACTIVATIONS] [BATCH]
+
+"""
+import sys
+import time
+import tracemalloc
+
+from experta import KnowledgeEngine, Fact, Rule, MATCH
+
+
+class Tick(Fact):
+    pass
+
+
+class Clock(KnowledgeEngine):
+    ticks = 0
+
+    @Rule(Tick(MATCH.value))
+    def tick(self, value):
+        self.ticks += 1
+
+
+def main(activations=1000000, batch=100000):
+    engine = Clock()
+    engine.reset()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    for value in range(1, activations + 1):
+        fact = engine.declare(Tick(value))
+        engine.run()
+        engine.retract(fact)
+
+        if value % batch == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print("%9d activations %8.1f KiB (peak %8.1f KiB) %6.1fs"
+                  % (engine.ticks,
+                     (current - baseline) / 1024,
+                     (peak - baseline) / 1024,
+                     time.perf_counter() - start))
+
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,99 @@
+def test_alphamemorynode_is_oneinputnode():
+    from experta.matchers.rete.nodes import AlphaMemoryNode
+    from experta.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(AlphaMemoryNode, OneInputNode)
+
+
+def test_alphamemorynode_unlinks_joins_with_empty_left_memory(TestNode):
+    from experta.matchers.rete.nodes import AlphaMemoryNode
+    from experta.matchers.rete.nodes import OrdinaryMatchNode
+    from experta.matchers.rete.check import SameContextCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    tested = []
+
+    def matcher(l, r):
+        tested.append((l, r))
+        return SameContextCheck()(l, r)
+
+    amn = AlphaMemoryNode()
+    omn1 = OrdinaryMatchNode(matcher)
+    omn2 = OrdinaryMatchNode(matcher)
+    amn.add_child(omn1, omn1.activate_right)
+    amn.add_child(omn2, omn2.activate_right)
+    tn = TestNode()
+    omn1.add_child(tn, tn.activate)
+
+    assert omn1.right_memory is omn2.right_memory is amn.memory
+    assert not amn.linked
+
+    # Right tokens are stored once, without activating the joins.
+    amn.activate(Token.valid(Fact(b=1)))
+    amn.activate(Token.valid(Fact(b=2)))
+    assert len(amn.memory) == 2
+    assert not tested
+
+    # A left token links the join, which finds the stored tokens.
+    omn1.activate_left(Token.valid(Fact(a=1)))
+    assert [child.node for child in amn.linked] == [omn1]
+    assert len(tn.added) == 2
+
+    amn.activate(Token.valid(Fact(b=3)))
+    assert len(tn.added) == 3
+    assert len(tested) == 3
+
+    omn1.activate_left(Token.invalid(Fact(a=1)))
+    assert not amn.linked
+    assert len(tn.added) == 6
+
+    amn._reset()
+    assert omn1.right_memory is amn.memory
+    assert not amn.memory
+
+
+def test_alpha_memories_are_shared_and_cloned():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH
+    from experta.matchers.rete.nodes import AlphaMemoryNode
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(a=1), Fact(b=MATCH.x))
+        def r1(self):
+            pass
+
+        @Rule(Fact(a=2), Fact(b=MATCH.x))
+        def r2(self):
+            pass
+
+    ke = KE()
+    ke.reset()
+
+    def memories(node):
+        if isinstance(node, AlphaMemoryNode):
+            yield node
+        for child in node.children:
+            yield from memories(child.node)
+
+    amn, = set(memories(ke.matcher.root_node))
+    assert len(amn.children) == 2
+    for child in amn.children:
+        assert child.node.right_memory is amn.memory
+
+    ke.declare(Fact(b=1), Fact(a=1))
+    assert len(amn.memory) == 1
+    assert len(amn.linked) == 1
+    assert [a.rule.__name__ for a in ke.agenda.activations] == ['r1']
+
+    forked = ke.fork()
+    forked_amn, = set(memories(forked.matcher.root_node))
+    assert forked_amn is not amn and len(forked_amn.linked) == 1
+    for child in forked_amn.children:
+        assert child.node.right_memory is forked_amn.memory
+
+    forked.declare(Fact(a=2))
+    ke.declare(Fact(b=2))
+    assert len(forked.agenda.activations) == 2
+    assert len(ke.agenda.activations) == 2
+    assert len(forked_amn.memory) == 1
+    assert len(amn.memory) == 2
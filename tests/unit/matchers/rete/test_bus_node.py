@@ -67,3 +67,63 @@ def test_busnode_remove(TestNode):
 
     assert tn1.added == [Token.invalid(Fact())]
     assert tn2.added == [Token.invalid(Fact())]
+
+
+def test_busnode_dispatch_by_fact_type(TestNode):
+    from experta.matchers.rete.nodes import BusNode
+    from experta.matchers.rete.check import TypeCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    bn = BusNode()
+    tn_a = TestNode()
+    tn_a.matcher = TypeCheck(A)
+    tn_b = TestNode()
+    tn_b.matcher = TypeCheck(B)
+    tn = TestNode()
+
+    bn.add_child(tn_a, tn_a.activate)
+    bn.add_child(tn_b, tn_b.activate)
+    bn.add_child(tn, tn.activate)
+
+    bn.add(A())
+    bn.remove(A())
+
+    assert tn_a.added == [Token.valid(A()), Token.invalid(A())]
+    assert tn_b.added == []
+    assert tn.added == [Token.valid(A()), Token.invalid(A())]
+
+
+def test_busnode_modify(TestNode):
+    from experta.matchers.rete.nodes import BusNode
+    from experta.matchers.rete.check import TypeCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    class A(Fact):
+        pass
+
+    bn = BusNode()
+    tn_a = TestNode()
+    tn_a.matcher = TypeCheck(A)
+    tn_f = TestNode()
+    tn_f.matcher = TypeCheck(Fact)
+
+    bn.add_child(tn_a, tn_a.activate)
+    bn.add_child(tn_f, tn_f.activate)
+
+    bn.modify(A(x=1), A(x=2), {'x'})
+
+    assert tn_a.added == [Token.invalid(A(x=1)), Token.valid(A(x=2))]
+    assert tn_f.added == []
+
+    bn.modify(A(x=2), Fact(x=2), set())
+
+    assert tn_a.added[-1] == Token.invalid(A(x=2))
+    assert tn_f.added == [Token.valid(Fact(x=2))]
@@ -292,3 +292,32 @@ def test_featurecheck_call_or():
     assert not check(Fact('mydata'))
     check = FeatureCheck(0, L('otherdata') | ~L('mydata'))
     assert not check(Fact('mydata'))
+
+
+def test_featurecheck_field():
+    from experta.matchers.rete.check import FeatureCheck
+    from experta import L
+
+    assert FeatureCheck('a', L(1)).field == 'a'
+    assert FeatureCheck('a__b__0', L(1)).field == 'a'
+    assert FeatureCheck('0__b', L(1)).field == 0
+    assert FeatureCheck(0, L(1)).field == 0
+    assert FeatureCheck('__factid__', L(1)).field is None
+
+
+def test_featurecheck_path():
+    from experta.matchers.rete.check import FeatureCheck
+    from experta import L, Fact
+
+    assert FeatureCheck('a', L(1)).path == ('a', )
+    assert FeatureCheck('a__b__0', L(1)).path == ('a', 'b', 0)
+    assert FeatureCheck(0, L(1)).path == (0, )
+    assert FeatureCheck('__factid__', L(1)).path == ()
+
+    check = FeatureCheck('a__b__0', L(1))
+    assert check(Fact(a={'b': [1]}))
+    assert not check(Fact(a={'b': [2]}))
+    assert not check(Fact(a={'b': []}))
+    assert not check(Fact(a={'c': [1]}))
+    assert not check(Fact(a=1))
+    assert not check(Fact(b=1))
@@ -88,3 +88,22 @@ def test_conflictsetchange_get_activations_data():
     assert list(added)[0].rule is rule
     assert f in list(added)[0].facts
     assert list(added)[0].context == {'data': 'test'}
+
+
+def test_conflictsetchange_add_and_remove_cancel_out():
+    from experta.matchers.rete.nodes import ConflictSetNode
+    from experta.matchers.rete.token import Token
+    from experta.rule import Rule
+    from experta.fact import Fact
+
+    csn = ConflictSetNode(Rule())
+
+    f = Fact(first=1)
+    f.__factid__ = 1
+
+    csn.activate(Token.valid(f, {'data': 'test'}))
+    csn.activate(Token.invalid(f, {'data': 'test'}))
+    csn.activate(Token.invalid(f, {'data': 'test'}))
+
+    assert csn.get_activations() == ([], [])
+    assert not csn.memory
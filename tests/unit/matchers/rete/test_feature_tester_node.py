@@ -143,3 +143,46 @@ def test_featuretesternode_pass_fact_to_matcher():
     ftn = FeatureTesterNode(_matcher)
 
     ftn.activate(Token.valid(fact))
+
+
+def test_featuretesternode_does_not_modify_received_token(TestNode):
+    from experta.matchers.rete.nodes import FeatureTesterNode
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    ftn = FeatureTesterNode(lambda f: {'something': True})
+    tn1 = TestNode()
+    ftn.add_child(tn1, tn1.activate)
+
+    token = Token.valid(Fact(test=True))
+    ftn.activate(token)
+
+    assert token.context == {}
+    assert tn1.added == [Token.valid(Fact(test=True), {'something': True})]
+
+
+def test_featuretesternode_modify_tests_unaffected_check_once(TestNode):
+    from experta.matchers.rete.nodes import FeatureTesterNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta import Fact, P
+
+    tested = []
+    ftn = FeatureTesterNode(
+        FeatureCheck('a', P(lambda a: tested.append(a) or a > 0)))
+    tn1 = TestNode()
+    ftn.add_child(tn1, tn1.activate)
+
+    old, new = Fact(a=1, b=1), Fact(a=1, b=2)
+    ftn.modify(Token.invalid(old), Token.valid(new), {'b'})
+
+    assert tested == [1]
+    assert tn1.added == [Token.invalid(old), Token.valid(new)]
+
+    tested.clear()
+    tn1.added.clear()
+    old, new = new, Fact(a=0, b=2)
+    ftn.modify(Token.invalid(old), Token.valid(new), {'a'})
+
+    assert tested == [1, 0]
+    assert tn1.added == [Token.invalid(old)]
@@ -0,0 +1,116 @@
+def test_literalswitchnode_exists():
+    try:
+        from experta.matchers.rete.nodes import LiteralSwitchNode
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_literalswitchnode_is_oneinputnode():
+    from experta.matchers.rete.nodes import LiteralSwitchNode
+    from experta.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(LiteralSwitchNode, OneInputNode)
+
+
+def test_literalswitchnode_activates_only_matching_branch(TestNode):
+    from experta.matchers.rete.nodes import LiteralSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    open_check = FeatureCheck('status', 'open')
+    closed_check = FeatureCheck('status', 'closed')
+
+    lsn = LiteralSwitchNode(open_check)
+    tn_open = TestNode()
+    tn_open.matcher = open_check
+    tn_closed = TestNode()
+    tn_closed.matcher = closed_check
+
+    lsn.add_child(tn_open, tn_open.activate)
+    lsn.add_child(tn_closed, tn_closed.activate)
+
+    lsn.activate(Token.valid(Fact(status='open')))
+    lsn.activate(Token.valid(Fact(status='pending')))
+    lsn.activate(Token.valid(Fact(other='open')))
+
+    assert tn_open.added == [Token.valid(Fact(status='open'))]
+    assert tn_closed.added == []
+
+
+def test_literalswitchnode_nested_field(TestNode):
+    from experta.matchers.rete.nodes import LiteralSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    check = FeatureCheck('data__0', 1)
+
+    lsn = LiteralSwitchNode(check)
+    tn = TestNode()
+    tn.matcher = check
+    lsn.add_child(tn, tn.activate)
+
+    lsn.activate(Token.valid(Fact(data=[1, 2])))
+    lsn.activate(Token.valid(Fact(data=[2, 1])))
+
+    assert tn.added == [Token.valid(Fact(data=[1, 2]))]
+
+
+def test_literal_tests_are_grouped_in_a_switch():
+    from experta import KnowledgeEngine, Rule, Fact
+    from experta.matchers.rete.nodes import LiteralSwitchNode
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(status='open'))
+        def r1(self):
+            pass
+
+        @Rule(Fact(status='closed'))
+        def r2(self):
+            pass
+
+    ke = Test()
+
+    def switches(node):
+        if isinstance(node, LiteralSwitchNode):
+            yield node
+        for child in node.children:
+            yield from switches(child.node)
+
+    found = list(switches(ke.matcher.root_node))
+    assert len(found) == 1
+    assert set(found[0].branches) == {'open', 'closed'}
+
+    ke.reset()
+    ke.declare(Fact(status='closed'))
+    assert [a.rule.__name__ for a in ke.agenda.activations] == ['r2']
+
+
+def test_literalswitchnode_modify(TestNode):
+    from experta.matchers.rete.nodes import LiteralSwitchNode
+    from experta.matchers.rete.nodes import FeatureTesterNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta import Fact
+
+    lsn = LiteralSwitchNode(FeatureCheck('status', 'open'))
+    branches = dict()
+    for status in ('open', 'closed'):
+        ftn = FeatureTesterNode(FeatureCheck('status', status))
+        lsn.add_child(ftn, ftn.activate)
+        branches[status] = TestNode()
+        ftn.add_child(branches[status], branches[status].activate)
+
+    old = Fact(status='open', n=1)
+    new = Fact(status='open', n=2)
+    lsn.modify(Token.invalid(old), Token.valid(new), {'n'})
+
+    assert branches['open'].added == [Token.invalid(old), Token.valid(new)]
+    assert not branches['closed'].added
+
+    old, new = new, Fact(status='closed', n=2)
+    lsn.modify(Token.invalid(old), Token.valid(new), {'status'})
+
+    assert branches['open'].added[-1] == Token.invalid(old)
+    assert branches['closed'].added == [Token.valid(new)]
@@ -83,3 +83,170 @@ def test_retematcher_changes_return_activations_if_csn():
 
     assert len(added) == 2
     assert all(isinstance(a, Activation) for a in added)
+
+
+def test_retematcher_changes_only_drain_changed_csn():
+    from experta.engine import KnowledgeEngine
+    from experta.fact import Fact
+    from experta.rule import Rule
+    from experta.matchers.rete.check import TypeCheck
+    from experta.matchers.rete.nodes import ConflictSetNode
+    from experta.matchers.rete.nodes import FeatureTesterNode
+    from experta.matchers.rete import ReteMatcher
+
+    class Other(Fact):
+        pass
+
+    class UntouchedCSN(ConflictSetNode):
+        def get_activations(self):
+            assert False, "Node without changes was drained"
+
+    matcher = ReteMatcher(KnowledgeEngine())
+
+    csn = ConflictSetNode(Rule())
+    matcher.root_node.add_child(csn, csn.activate)
+
+    other_type = FeatureTesterNode(TypeCheck(Other))
+    untouched = UntouchedCSN(Rule())
+    matcher.root_node.add_child(other_type, other_type.activate)
+    other_type.add_child(untouched, untouched.activate)
+
+    added, removed = matcher.changes(adding=[Fact(__factid__=1)])
+
+    assert len(added) == 1
+    assert not matcher.changed_nodes
+
+
+def test_retematcher_network_is_compiled_once_per_engine_class(monkeypatch):
+    from experta.matchers.rete import ReteMatcher
+    from experta import KnowledgeEngine, Rule, Fact, MATCH, NOT
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a=MATCH.x), NOT(Fact(b=MATCH.x)))
+        def r1(self, x):
+            pass
+
+    compiled = []
+    compile_network = ReteMatcher.compile_network.__func__
+
+    def _compile_network(cls, engine, root_node):
+        compiled.append(engine)
+        return compile_network(cls, engine, root_node)
+
+    monkeypatch.setattr(ReteMatcher, 'compile_network',
+                        classmethod(_compile_network))
+
+    ke1 = Test()
+    ke2 = Test()
+    assert len(compiled) == 1
+    assert ke1.matcher.root_node is not ke2.matcher.root_node
+
+    ke1.reset()
+    ke2.reset()
+    ke1.declare(Fact(a=1))
+    assert len(ke1.agenda.activations) == 1
+    assert len(ke2.agenda.activations) == 0
+
+    ke2.declare(Fact(a=1), Fact(b=1))
+    assert len(ke1.agenda.activations) == 1
+    assert len(ke2.agenda.activations) == 0
+
+
+def test_node_clone_shares_checks_and_resets_memories():
+    from experta.matchers.rete.nodes import BusNode, FeatureTesterNode
+    from experta.matchers.rete.nodes import OrdinaryMatchNode
+    from experta.matchers.rete.check import TypeCheck, SameContextCheck
+    from experta.matchers.rete.token import Token
+    from experta import Fact
+
+    root = BusNode()
+    ftn = FeatureTesterNode(TypeCheck(Fact))
+    join = OrdinaryMatchNode(SameContextCheck())
+    root.add_child(ftn, ftn.activate)
+    ftn.add_child(join, join.activate_left)
+    ftn.add_child(join, join.activate_right)
+    join.activate_left(Token.valid(Fact(a=1)))
+
+    clone = root.clone()
+    ftn_clone = clone.children[0].node
+    left, right = ftn_clone.children
+
+    assert ftn_clone is not ftn and ftn_clone.matcher is ftn.matcher
+    assert clone.typed_children[Fact][0].node is ftn_clone
+    assert left.node is right.node is not join
+    assert left.callback == left.node.activate_left
+    assert right.callback == right.node.activate_right
+    assert not left.node.left_memory
+    assert len(join.left_memory) == 1
+
+
+def test_rules_with_common_prefix_share_beta_nodes():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH, NOT, TEST
+    from experta.matchers.rete.nodes import OrdinaryMatchNode, NotNode
+
+    class KE(KnowledgeEngine):
+        pass
+
+    def make_rule(name, last):
+        def rule(self):
+            pass
+        rule.__name__ = name
+        return Rule(Fact(a=MATCH.x),
+                    Fact(b=MATCH.x),
+                    NOT(Fact(c=MATCH.x)),
+                    last)(rule)
+
+    for i in range(20):
+        setattr(KE, 'r%d' % i, make_rule('r%d' % i, Fact(d=i)))
+    KE.same = make_rule('same', Fact(d=0))
+
+    ke = KE()
+
+    nodes = set()
+    pending = [ke.matcher.root_node]
+    while pending:
+        node = pending.pop()
+        nodes.add(node)
+        pending.extend(child.node for child in node.children)
+
+    # One join and one negation for the prefix, and one join for each
+    # distinct last pattern.
+    assert len([n for n in nodes if isinstance(n, NotNode)]) == 1
+    assert len([n for n in nodes if isinstance(n, OrdinaryMatchNode)]) == 21
+
+    ke.reset()
+    ke.declare(Fact(a=1), Fact(b=1), Fact(a=2), Fact(b=2), Fact(c=2),
+               Fact(d=0), Fact(d=5))
+    assert sorted(a.rule.__name__ for a in ke.agenda.activations) \
+        == ['r0', 'r5', 'same']
+
+
+def test_retematcher_collects_conflict_set_nodes_once(monkeypatch):
+    from experta.matchers.rete import ReteMatcher
+    from experta import KnowledgeEngine, Rule, Fact
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a=1))
+        def r1(self):
+            pass
+
+    calls = []
+    link = ReteMatcher._link_conflict_set_nodes
+
+    def counted(self):
+        calls.append(self)
+        return link(self)
+
+    monkeypatch.setattr(ReteMatcher, '_link_conflict_set_nodes', counted)
+
+    ke1 = Test()
+    ke1.reset()
+    ke2 = ke1.fork()
+    for _ in range(3):
+        ke1.declare(Fact(a=1))
+        ke2.declare(Fact(a=1))
+        ke1.reset()
+
+    assert calls == [ke1.matcher, ke2.matcher]
+    assert len(ke1.matcher.conflict_set_nodes) == 1
+    assert len(ke2.agenda.activations) == 1
@@ -0,0 +1,99 @@
+def test_membershipswitchnode_is_oneinputnode():
+    from experta.matchers.rete.nodes import MembershipSwitchNode
+    from experta.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(MembershipSwitchNode, OneInputNode)
+
+
+def test_membershipswitchnode_get_kind():
+    from experta.matchers.rete.nodes import MembershipSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.operator import CONTAINS, GE
+    from experta.utils import anyof
+    from experta import P
+
+    def kind(how):
+        return MembershipSwitchNode.get_kind(FeatureCheck('v', how))
+
+    assert kind(anyof(1, 2)) == 'anyof'
+    assert kind(CONTAINS(1)) == 'contains'
+    assert kind(GE(1)) is None
+    assert kind(P(lambda v: v in (1, 2))) is None
+    assert kind(1) is None
+
+
+def test_membershipswitchnode_activates_only_candidate_branches(TestNode):
+    from experta.matchers.rete.nodes import MembershipSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta.operator import CONTAINS
+    from experta.utils import anyof
+    from experta.fact import Fact
+
+    checks = {'ab': FeatureCheck('v', anyof('a', 'b')),
+              'bc': FeatureCheck('v', anyof('b', 'c', 'c')),
+              'list': FeatureCheck('v', anyof([1])),
+              'has_a': FeatureCheck('v', CONTAINS('a')),
+              'has_b': FeatureCheck('v', CONTAINS('b'))}
+
+    msn = MembershipSwitchNode(checks['ab'])
+    nodes = dict()
+    for name, check in checks.items():
+        nodes[name] = TestNode()
+        nodes[name].matcher = check
+        msn.add_child(nodes[name], nodes[name].activate)
+
+    def activated(value):
+        for node in nodes.values():
+            node.added.clear()
+        msn.activate(Token.valid(Fact(v=value)))
+        assert all(len(node.added) <= 1 for node in nodes.values())
+        return {name for name, node in nodes.items() if node.added}
+
+    # Unindexed children (unhashable values) are always selected.
+    assert activated('b') == {'ab', 'bc', 'list',
+                              'has_a', 'has_b'}  # Substrings.
+    assert activated(5) == {'list', 'has_a', 'has_b'}
+    assert activated(('a', 'x', 'a')) == {'list', 'has_a'}
+    assert activated(frozenset('ab')) == {'list', 'has_a', 'has_b'}
+    assert activated([1]) == {'list'}
+
+
+def test_membership_tests_are_grouped_in_a_switch():
+    from experta import KnowledgeEngine, Rule, Fact
+    from experta.operator import CONTAINS
+    from experta.utils import anyof
+    from experta.matchers.rete.nodes import MembershipSwitchNode
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(code=anyof('A1', 'A2', 'B1')))
+        def r1(self):
+            pass
+
+        @Rule(Fact(code=anyof('B1', 'B2')))
+        def r2(self):
+            pass
+
+        @Rule(Fact(code=CONTAINS('A1')))
+        def r3(self):
+            pass
+
+    ke = Test()
+
+    def switches(node):
+        if isinstance(node, MembershipSwitchNode):
+            yield node
+        for child in node.children:
+            yield from switches(child.node)
+
+    found = list(switches(ke.matcher.root_node))
+    assert len(found) == 1
+    assert len(found[0].children) == 3
+
+    for value, expected in [('A1', {'r1', 'r3'}),
+                            ('B1', {'r1', 'r2'}),
+                            ('C1', set()),
+                            (('A1', 'B1'), {'r3'})]:
+        ke.reset()
+        ke.declare(Fact(code=value))
+        assert {a.rule.__name__ for a in ke.agenda.activations} == expected
@@ -0,0 +1,89 @@
+import pytest
+
+
+def test_betamemory_exists():
+    try:
+        from experta.matchers.rete.memory import BetaMemory
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_betamemory_without_keys_behaves_like_list():
+    from experta.matchers.rete.memory import BetaMemory
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    memory = BetaMemory()
+    t1 = Token.valid(Fact(a=1), {'a': 1}).to_info()
+    t2 = Token.valid(Fact(a=2), {'a': 2}).to_info()
+
+    assert not memory
+
+    memory.append(t1)
+    memory.append(t2)
+    memory.append(t1)
+
+    assert len(memory) == 3
+    assert list(memory) == [t1, t1, t2]
+    assert list(memory.candidates({'a': 3})) == [t1, t1, t2]
+
+    memory.remove(t1)
+    assert list(memory) == [t1, t2]
+
+    memory.remove(t1)
+    memory.remove(t2)
+    assert not memory
+
+    with pytest.raises(ValueError):
+        memory.remove(t1)
+
+
+def test_betamemory_candidates_are_filtered_by_keys():
+    from experta.matchers.rete.memory import BetaMemory
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    memory = BetaMemory(['a'])
+    t1 = Token.valid(Fact(a=1), {'a': 1}).to_info()
+    t2 = Token.valid(Fact(a=2), {'a': 2}).to_info()
+    t3 = Token.valid(Fact(b=3), {'b': 3}).to_info()
+
+    memory.append(t1)
+    memory.append(t2)
+    memory.append(t3)
+
+    assert list(memory.candidates({'a': 1})) == [t1, t3]
+    assert list(memory.candidates({'a': 2, 'b': 0})) == [t2, t3]
+    assert list(memory.candidates({'a': 4})) == [t3]
+    assert set(memory.candidates({'b': 3})) == {t1, t2, t3}
+    assert t2 in memory
+
+    memory.remove(t2)
+    assert t2 not in memory
+    assert list(memory.candidates({'a': 2})) == [t3]
+
+
+def test_betamemory_copy_on_write():
+    from experta.matchers.rete.memory import BetaMemory
+    from experta.matchers.rete.token import Token
+    from experta import Fact
+
+    memory = BetaMemory(['x'])
+    infos = [Token.valid(Fact(i), {'x': i % 2}).to_info() for i in range(4)]
+    for info in infos:
+        memory.append(info)
+
+    copy = memory.copy()
+    assert copy.buckets[(0, )] is memory.buckets[(0, )]
+
+    copy.remove(infos[0])
+    copy.append(infos[0])
+    copy.append(infos[0])
+    memory.remove(infos[1])
+
+    assert copy.buckets[(0, )] is not memory.buckets[(0, )]
+    assert sorted(memory, key=infos.index) == [infos[0], infos[2], infos[3]]
+    assert sorted(copy, key=infos.index) == [infos[0], infos[0],
+                                             infos[1], infos[2], infos[3]]
+    assert len(memory) == 3
+    assert len(copy) == 5
@@ -202,3 +202,47 @@ def test_notnode_right_activate_valid_match_just_one(TestNode):
     assert Token.invalid(Fact(test='data')) in tn1.added
     assert Token.invalid(Fact(test='data')) in tn2.added
     assert nn.left_memory[token.to_info()] == 1
+
+
+def test_notnode_join_keys_only_visit_affected_tokens(TestNode):
+    from experta.matchers.rete.nodes import NotNode
+    from experta.matchers.rete.check import SameContextCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    tested = []
+
+    def matcher(l, r):
+        tested.append((l, r))
+        return SameContextCheck()(l, r)
+
+    nn = NotNode(matcher, ['x'])
+    tn1 = TestNode()
+    nn.add_child(tn1, tn1.activate)
+
+    lefts = [Token.valid(Fact(x=i), {'x': i}) for i in range(10)]
+    for token in lefts:
+        nn.activate_left(token)
+
+    assert tn1.added == lefts
+    tn1.added.clear()
+
+    blocker = Token.valid(Fact(ticket=3), {'x': 3})
+    nn.activate_right(blocker)
+    nn.activate_right(blocker)
+
+    assert len(tested) == 2
+    assert tn1.added == [Token.invalid(Fact(x=3), {'x': 3})]
+    assert nn.left_memory[lefts[3].to_info()] == 2
+
+    nn.activate_right(Token.invalid(Fact(ticket=3), {'x': 3}))
+    nn.activate_right(Token.invalid(Fact(ticket=3), {'x': 3}))
+
+    assert len(tested) == 4
+    assert tn1.added[-1] == Token.valid(Fact(x=3), {'x': 3})
+    assert not nn.right_memory
+
+    nn.activate_left(Token.invalid(Fact(x=5), {'x': 5}))
+
+    assert tn1.added[-1] == Token.invalid(Fact(x=5), {'x': 5})
+    assert lefts[5].to_info() not in nn.left_memory
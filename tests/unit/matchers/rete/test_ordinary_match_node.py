@@ -207,3 +207,33 @@ def test_ordinarymatchnode_right_activate_invalid_build_new_tokens(TestNode):
                                         Fact(leftdata='leftdata1')]),
                          Token.invalid([Fact(rightdata='rightdata'),
                                         Fact(leftdata='leftdata2')])]
+
+
+def test_ordinarymatchnode_join_keys_only_test_candidates(TestNode):
+    from experta.matchers.rete.nodes import OrdinaryMatchNode
+    from experta.matchers.rete.check import SameContextCheck
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    tested = []
+
+    def matcher(l, r):
+        tested.append((l, r))
+        return SameContextCheck()(l, r)
+
+    omn = OrdinaryMatchNode(matcher, ['a'])
+    tn1 = TestNode()
+    omn.add_child(tn1, tn1.activate)
+
+    for i in range(10):
+        omn.activate_right(Token.valid(Fact(b=i), {'a': i}))
+
+    omn.activate_left(Token.valid(Fact(c=3), {'a': 3}))
+
+    assert len(tested) == 1
+    assert tn1.added == [Token.valid([Fact(c=3), Fact(b=3)], {'a': 3})]
+
+    omn.activate_right(Token.invalid(Fact(b=3), {'a': 3}))
+
+    assert tn1.added[-1] == Token.invalid([Fact(c=3), Fact(b=3)], {'a': 3})
+    assert len(omn.right_memory) == 9
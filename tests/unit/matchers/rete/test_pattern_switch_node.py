@@ -0,0 +1,102 @@
+import re
+
+
+def test_patternswitchnode_is_oneinputnode():
+    from experta.matchers.rete.nodes import PatternSwitchNode
+    from experta.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(PatternSwitchNode, OneInputNode)
+
+
+def test_patternswitchnode_get_prefix():
+    from experta.matchers.rete.nodes import PatternSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.operator import REGEX, LIKE, ILIKE, GE
+
+    def prefix(how):
+        return PatternSwitchNode.get_prefix(FeatureCheck('v', how))
+
+    assert prefix(REGEX('abc')) == (True, 'abc')
+    assert prefix(REGEX('^ab.d')) == (True, 'ab')
+    assert prefix(REGEX('abc*')) == (True, 'ab')
+    assert prefix(REGEX('abc?d')) == (True, 'ab')
+    assert prefix(REGEX('abc+')) == (True, 'abc')
+    assert prefix(REGEX(r'ab\.c')) == (True, 'ab')
+    assert prefix(REGEX('ab|cd')) == (True, '')
+    assert prefix(REGEX('abc', re.IGNORECASE)) == (True, '')
+    assert prefix(REGEX(b'abc')) is None
+    assert prefix(LIKE('ab*.txt')) == (True, 'ab')
+    assert prefix(LIKE('a?c')) == (True, 'a')
+    assert prefix(ILIKE('AB[cd]')) == (False, 'ab')
+    assert prefix(GE(1)) is None
+
+
+def test_patternswitchnode_activates_only_candidate_branches(TestNode):
+    from experta.matchers.rete.nodes import PatternSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta.operator import REGEX, LIKE, ILIKE
+    from experta.fact import Fact
+
+    checks = {'err': FeatureCheck('v', REGEX('ERR-[0-9]+')),
+              'error': FeatureCheck('v', LIKE('ERROR*')),
+              'warn': FeatureCheck('v', ILIKE('Warn*')),
+              'any': FeatureCheck('v', REGEX('.*timeout'))}
+
+    psn = PatternSwitchNode(checks['err'])
+    nodes = dict()
+    for name, check in checks.items():
+        nodes[name] = TestNode()
+        nodes[name].matcher = check
+        psn.add_child(nodes[name], nodes[name].activate)
+
+    def activated(value):
+        for node in nodes.values():
+            node.added.clear()
+        psn.activate(Token.valid(Fact(v=value)))
+        return {name for name, node in nodes.items() if node.added}
+
+    assert activated('ERROR: disk full') == {'error', 'any'}
+    assert activated('ERR-12') == {'err', 'any'}
+    assert activated('WARNING') == {'warn', 'any'}
+    assert activated('info') == {'any'}
+    assert activated(1) == set(checks)
+
+
+def test_pattern_tests_are_grouped_in_a_switch():
+    from experta import KnowledgeEngine, Rule, Fact
+    from experta.operator import REGEX, LIKE, ILIKE
+    from experta.matchers.rete.nodes import PatternSwitchNode
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(msg=REGEX('ERR-[0-9]+$')))
+        def r1(self):
+            pass
+
+        @Rule(Fact(msg=LIKE('ERR*')))
+        def r2(self):
+            pass
+
+        @Rule(Fact(msg=ILIKE('err-1*')))
+        def r3(self):
+            pass
+
+    ke = Test()
+
+    def switches(node):
+        if isinstance(node, PatternSwitchNode):
+            yield node
+        for child in node.children:
+            yield from switches(child.node)
+
+    found = list(switches(ke.matcher.root_node))
+    assert len(found) == 1
+    assert len(found[0].children) == 3
+
+    for value, expected in [('ERR-12', {'r1', 'r2', 'r3'}),
+                            ('ERR-21x', {'r2'}),
+                            ('Err-10', {'r3'}),
+                            ('OK', set())]:
+        ke.reset()
+        ke.declare(Fact(msg=value))
+        assert {a.rule.__name__ for a in ke.agenda.activations} == expected
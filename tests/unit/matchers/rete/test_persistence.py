@@ -0,0 +1,101 @@
+import pickle
+
+import pytest
+
+
+@pytest.fixture
+def CachedMatcher(tmp_path, monkeypatch):
+    import weakref
+    from experta.matchers.rete import ReteMatcher, NetworkCache
+
+    monkeypatch.setattr(ReteMatcher, '_templates',
+                        weakref.WeakKeyDictionary())
+
+    class CachedMatcher(ReteMatcher):
+        network_cache = NetworkCache(str(tmp_path))
+        compiled = 0
+
+        @classmethod
+        def compile_network(cls, engine, root_node):
+            cls.compiled += 1
+            return super().compile_network(engine, root_node)
+
+    return CachedMatcher
+
+
+def get_engine_class(matcher):
+    from experta import KnowledgeEngine, Rule, Fact, MATCH, NOT, TEST, P
+
+    class Thing(Fact):
+        pass
+
+    class KE(KnowledgeEngine):
+        __matcher__ = matcher
+
+        @Rule(Thing(v=MATCH.x & P(lambda x: x > 1)),
+              NOT(Fact(blocked=MATCH.x)),
+              TEST(lambda x: x < 10))
+        def r1(self, x):
+            self.declare(Fact(fired=x))
+
+    return KE, Thing
+
+
+def test_checks_are_picklable():
+    from experta.matchers.rete.check import FeatureCheck, WhereCheck
+    from experta import L, W
+
+    check = FeatureCheck('a', L(1) | ~W('x'))
+    assert pickle.loads(pickle.dumps(check)) is check
+
+    check = WhereCheck(len)
+    assert pickle.loads(pickle.dumps(check)) is check
+
+
+def test_network_is_stored_and_loaded(CachedMatcher, tmp_path):
+    from experta.matchers.rete import ReteMatcher
+    from experta import Fact
+
+    KE, Thing = get_engine_class(CachedMatcher)
+    KE()
+    assert CachedMatcher.compiled == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+    ReteMatcher._templates.clear()
+    ke = KE()
+    assert CachedMatcher.compiled == 1
+
+    ke.reset()
+    ke.declare(Thing(v=3), Thing(v=4), Fact(blocked=4))
+    ke.run()
+    assert [f['fired'] for f in ke.facts.values() if 'fired' in f] == [3]
+
+
+def test_network_cache_key_depends_on_rules(CachedMatcher):
+    from experta.matchers.rete.persistence import get_key
+    from experta import Rule, Fact
+
+    KE1, _ = get_engine_class(CachedMatcher)
+    KE2, _ = get_engine_class(CachedMatcher)
+
+    assert get_key(KE1, CachedMatcher) == get_key(KE2, CachedMatcher)
+
+    class KE3(KE2):
+        @Rule(Fact(v=1))
+        def r1(self):
+            pass
+
+    assert get_key(KE1, CachedMatcher) != get_key(KE3, CachedMatcher)
+
+
+def test_corrupted_network_is_compiled_again(CachedMatcher, tmp_path):
+    from experta.matchers.rete import ReteMatcher
+
+    KE, _ = get_engine_class(CachedMatcher)
+    KE()
+    stored, = tmp_path.iterdir()
+    stored.write_bytes(b'garbage')
+
+    ReteMatcher._templates.clear()
+    KE()
+    assert CachedMatcher.compiled == 2
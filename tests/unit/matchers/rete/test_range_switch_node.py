@@ -0,0 +1,107 @@
+def test_rangeswitchnode_is_oneinputnode():
+    from experta.matchers.rete.nodes import RangeSwitchNode
+    from experta.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(RangeSwitchNode, OneInputNode)
+
+
+def test_rangeswitchnode_get_bounds():
+    from experta.matchers.rete.nodes import RangeSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.operator import LT, GE, BETWEEN, EQ
+    from experta import P
+
+    def bounds(how):
+        return RangeSwitchNode.get_bounds(FeatureCheck('v', how))
+
+    assert bounds(GE(1)) == (1, None)
+    assert bounds(LT(2.5)) == (None, 2.5)
+    assert bounds(BETWEEN(1, 3)) == (1, 3)
+    assert bounds(GE('a')) is None
+    assert bounds(GE(float('nan'))) is None
+    assert bounds(EQ(1)) is None
+    assert bounds(P(lambda v: v > 1)) is None
+    assert bounds(1) is None
+
+
+def test_rangeswitchnode_activates_only_candidate_branches(TestNode):
+    from experta.matchers.rete.nodes import RangeSwitchNode
+    from experta.matchers.rete.check import FeatureCheck
+    from experta.matchers.rete.token import Token
+    from experta.operator import LT, LE, GT, GE, BETWEEN
+    from experta.fact import Fact
+
+    checks = {'gt5': FeatureCheck('v', GT(5)),
+              'ge5': FeatureCheck('v', GE(5)),
+              'lt0': FeatureCheck('v', LT(0)),
+              'le10': FeatureCheck('v', LE(10)),
+              'in1_3': FeatureCheck('v', BETWEEN(1, 3)),
+              'in2_8': FeatureCheck('v', BETWEEN(2, 8))}
+
+    rsn = RangeSwitchNode(checks['gt5'])
+    nodes = dict()
+    for name, check in checks.items():
+        nodes[name] = TestNode()
+        nodes[name].matcher = check
+        rsn.add_child(nodes[name], nodes[name].activate)
+
+    def activated(value):
+        for node in nodes.values():
+            node.added.clear()
+        rsn.activate(Token.valid(Fact(v=value)))
+        return {name for name, node in nodes.items() if node.added}
+
+    # Values equal to a strict bound are selected, the check of the
+    # child discards them.
+    assert activated(5) == {'gt5', 'ge5', 'le10', 'in2_8'}
+    assert activated(2) == {'le10', 'in1_3', 'in2_8'}
+    assert activated(11) == {'gt5', 'ge5'}
+    assert activated(-1) == {'lt0', 'le10'}
+    assert activated('x') == set(checks)
+
+    for node in nodes.values():
+        node.added.clear()
+    rsn.activate(Token.valid(Fact(other=1)))
+    assert not any(node.added for node in nodes.values())
+
+
+def test_range_tests_are_grouped_in_a_switch():
+    from experta import KnowledgeEngine, Rule, Fact
+    from experta.operator import LT, GE, BETWEEN
+    from experta.matchers.rete.nodes import RangeSwitchNode
+
+    thresholds = range(0, 100, 7)
+
+    class Test(KnowledgeEngine):
+        pass
+
+    def make_rule(name, how):
+        def rule(self):
+            pass
+        rule.__name__ = name
+        return Rule(Fact(v=how))(rule)
+
+    for t in thresholds:
+        setattr(Test, 'ge%d' % t, make_rule('ge%d' % t, GE(t)))
+        setattr(Test, 'lt%d' % t, make_rule('lt%d' % t, LT(t)))
+        setattr(Test, 'in%d' % t, make_rule('in%d' % t, BETWEEN(t, t + 10)))
+
+    ke = Test()
+
+    def switches(node):
+        if isinstance(node, RangeSwitchNode):
+            yield node
+        for child in node.children:
+            yield from switches(child.node)
+
+    found = list(switches(ke.matcher.root_node))
+    assert len(found) == 1
+    assert len(found[0].children) == 3 * len(thresholds)
+
+    for value in (-1, 0, 7, 50, 52.5, 99, 100):
+        ke.reset()
+        ke.declare(Fact(v=value))
+        expected = {'ge%d' % t for t in thresholds if value >= t}
+        expected |= {'lt%d' % t for t in thresholds if value < t}
+        expected |= {'in%d' % t for t in thresholds if t <= value <= t + 10}
+        assert {a.rule.__name__ for a in ke.agenda.activations} == expected
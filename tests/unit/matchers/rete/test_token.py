@@ -86,3 +86,15 @@ def test_token_copy_mutable():
     assert a == b and a is not b
     assert a.data == b.data and a.data is not b.data
     assert a.context == b.context and a.context is not b.context
+
+
+def test_token_extend_shares_data():
+    from experta.matchers.rete.token import Token
+    from experta.fact import Fact
+
+    a = Token.valid(Fact(a=1), {'x': 1})
+    b = a.extend({'y': 2})
+
+    assert b == Token.valid(Fact(a=1), {'x': 1, 'y': 2})
+    assert a.context == {'x': 1}
+    assert b.data is a.data
@@ -76,3 +76,88 @@ def test_illegal_CE():
 
     with pytest.raises(TypeError):
         KE()
+
+
+def test_extract_bound_variables():
+    from experta import Fact, MATCH, L, W, NOT
+    from experta.operator import GE
+
+    assert utils.extract_bound_variables(
+        Fact(MATCH.a, b=MATCH.b & GE(0), c=~MATCH.c)) == {'a', 'b'}
+    assert utils.extract_bound_variables(
+        Fact(a=MATCH.a | MATCH.b, b=MATCH.c | L(1))) == set()
+    assert utils.extract_bound_variables(
+        Fact(a=W('x'), __bind__='f')) == {'x', 'f'}
+    assert utils.extract_bound_variables(NOT(Fact(MATCH.a))) == set()
+
+
+def test_order_joins():
+    from experta import Fact, MATCH, NOT, TEST, L
+
+    a = Fact(a=MATCH.x)
+    b = Fact(b=MATCH.y)
+    c = Fact(c=MATCH.z)
+    ab = Fact(x=MATCH.x, y=MATCH.y, kind='k')
+    test = TEST(lambda x: x)
+    not_c = NOT(Fact(c=MATCH.x))
+    negated = Fact(d=~MATCH.x)
+
+    # Selective patterns first, then the ones sharing variables.
+    assert utils.order_joins([c, a, b, ab]) == [ab, a, b, c]
+    assert utils.order_joins([a, c, b]) == [a, c, b]
+
+    # Other elements and patterns testing negated variables stay in
+    # place.
+    assert utils.order_joins([a, b, test, not_c, c, ab]) \
+        == [a, b, test, not_c, ab, c]
+    assert utils.order_joins([a, negated, b, ab]) == [a, negated, ab, b]
+
+    assert utils.estimate_selectivity(ab) > utils.estimate_selectivity(a)
+    assert utils.estimate_selectivity(
+        Fact(a=L(1) | MATCH.x)) == utils.estimate_selectivity(a)
+
+
+def test_reorder_joins_keeps_activations():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH, NOT, TEST
+    from experta.matchers.rete import ReteMatcher
+    from experta.matchers.rete.nodes import OrdinaryMatchNode
+
+    class ReorderingMatcher(ReteMatcher):
+        reorder_joins = True
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(a=MATCH.x),
+              Fact(b=MATCH.y),
+              Fact(x=MATCH.x, y=MATCH.y, kind='k'),
+              TEST(lambda x, y: x != y),
+              NOT(Fact(blocked=MATCH.x)))
+        def r1(self, x, y):
+            pass
+
+    class ReorderingKE(KE):
+        __matcher__ = ReorderingMatcher
+
+    def run(engine_class):
+        ke = engine_class()
+        ke.reset()
+        ke.declare(*[Fact(a=i) for i in range(10)])
+        ke.declare(*[Fact(b=i) for i in range(10)])
+        ke.declare(Fact(x=1, y=2, kind='k'), Fact(x=3, y=4, kind='k'),
+                   Fact(x=5, y=5, kind='k'), Fact(blocked=3))
+
+        memory = 0
+        pending = [ke.matcher.root_node]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, OrdinaryMatchNode):
+                memory += len(node.left_memory)
+            pending.extend(child.node for child in node.children)
+
+        return {(a.context['x'], a.context['y'])
+                for a in ke.agenda.activations}, memory
+
+    activations, memory = run(KE)
+    reordered_activations, reordered_memory = run(ReorderingKE)
+
+    assert activations == reordered_activations == {(1, 2)}
+    assert reordered_memory < memory
@@ -36,3 +36,17 @@ def test_activation_in_set():
     from experta.activation import Activation
 
     assert Activation(None, []) in {Activation(None, [])}
+
+
+def test_activation_is_compact_and_immutable():
+    from experta.activation import Activation
+    from experta import Rule, Fact
+
+    act = Activation(Rule(), [Fact(1), Fact(2)], {'a': 1})
+
+    assert not hasattr(act, '__dict__')
+    assert act.facts == frozenset([Fact(1), Fact(2)])
+    assert hash(act) == hash(Activation(Rule(),
+                                        (Fact(2), Fact(1)),
+                                        {'a': 1}))
+    assert act != Activation(Rule(), [Fact(1), Fact(2)], {'a': 2})
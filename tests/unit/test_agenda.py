@@ -23,3 +23,64 @@ def test_agenda_get_next():
     agenda.activations.append("Foo")
     assert agenda.get_next() == "Foo"
     assert "Foo" not in agenda.activations
+
+
+def test_agenda_remove_activation_with_same_key_as_others():
+    from experta.agenda import Agenda
+    from experta.activation import Activation
+    from experta import Rule, Fact
+
+    fact = Fact(0, __factid__=0)
+    acts = [Activation(Rule(Fact(i)), facts=(fact, )) for i in range(5)]
+
+    agenda = Agenda()
+    for act in acts:
+        act.key = (0, [0])
+        agenda.add(act)
+
+    for idx in (2, 0, 4, 1, 3):
+        act = acts[idx]
+        agenda.remove(act)
+        assert act not in agenda
+
+    assert not agenda.activations
+
+
+def test_heapagenda_is_agenda():
+    from experta.agenda import Agenda, HeapAgenda
+
+    assert issubclass(HeapAgenda, Agenda)
+
+
+def test_heapagenda_same_order_as_agenda():
+    from random import shuffle
+
+    from experta.agenda import Agenda, HeapAgenda
+    from experta.activation import Activation
+    from experta.strategies import DepthStrategy
+    from experta import Rule, Fact
+
+    facts = [Fact(i, __factid__=i) for i in range(20)]
+    acts = [Activation(Rule(salience=i % 3), facts=(facts[i], ))
+            for i in range(20)]
+    shuffle(acts)
+
+    st = DepthStrategy()
+    agenda = Agenda()
+    heap_agenda = HeapAgenda()
+
+    st.update_agenda(agenda, acts, [])
+    st.update_agenda(heap_agenda, acts, [])
+    st.update_agenda(agenda, [], acts[:5])
+    st.update_agenda(heap_agenda, [], acts[:5])
+
+    assert heap_agenda.activations == agenda.activations
+    assert len(heap_agenda) == 15
+    assert acts[0] not in heap_agenda
+    assert acts[5] in heap_agenda
+
+    while agenda.activations:
+        assert heap_agenda.get_next() is agenda.get_next()
+
+    assert heap_agenda.get_next() is None
+    assert not heap_agenda.entries
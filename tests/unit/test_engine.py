@@ -123,6 +123,62 @@ def test_KnowledgeEngine_get_rules_returns_the_list_of_rules():
     assert all(isinstance(x, Rule) for x in rules)
 
 
+def test_KnowledgeEngine_rules_and_deffacts_are_discovered_once(monkeypatch):
+    import inspect
+    from experta.engine import KnowledgeEngine
+    from experta import Rule, DefFacts, Fact, InitialFact
+
+    evaluated = 0
+
+    class Base(KnowledgeEngine):
+        @Rule(InitialFact())
+        def rule1(self):
+            pass
+
+    class Test(Base):
+        @Rule(InitialFact())
+        def rule2(self):
+            pass
+
+        @DefFacts()
+        def numbers(self, n):
+            yield Fact(n=n)
+
+        @property
+        def expensive(self):
+            nonlocal evaluated
+            evaluated += 1
+
+    assert Base().get_rules() == [Base.rule1]
+
+    inspected = []
+    getattr_static = inspect.getattr_static
+    signature = inspect.signature
+
+    def _getattr_static(obj, *args):
+        inspected.append(obj)
+        return getattr_static(obj, *args)
+
+    def _signature(obj, *args, **kwargs):
+        inspected.append(obj)
+        return signature(obj, *args, **kwargs)
+
+    monkeypatch.setattr(inspect, 'getattr_static', _getattr_static)
+    monkeypatch.setattr(inspect, 'signature', _signature)
+
+    for n in range(3):
+        ke = Test()
+        assert [r._wrapped.__name__ for r in ke.get_rules()] == ['rule1',
+                                                                 'rule2']
+        ke.reset(n=n, other=True)
+        assert [f['n'] for f in ke.facts.values() if 'n' in f] == [n]
+
+    assert inspected.count(Test) == len(dir(Test))
+    assert Test.numbers not in inspected
+    assert Test.numbers._wrapped not in inspected
+    assert evaluated == 0
+
+
 def test_KnowledgeEngine_get_activations_exists():
     from experta.engine import KnowledgeEngine
 
@@ -870,6 +926,150 @@ def test_modify_retracts_and_declare():
     assert f2['key'] == 'test_key'
 
 
+def test_modify_only_reevaluates_checks_over_changed_fields():
+    from experta import KnowledgeEngine, Rule, Fact, AS, P, MATCH, TEST
+
+    tested = []
+
+    def is_big(value):
+        tested.append(value)
+        return value > 10
+
+    class Counter(KnowledgeEngine):
+        @Rule(AS.f << Fact(size=P(is_big), count=MATCH.c),
+              salience=1)
+        def big(self, f, c):
+            pass
+
+        @Rule(AS.f << Fact(size=MATCH.s, count=MATCH.c),
+              Fact(limit=MATCH.l),
+              TEST(lambda c, l: c < l))
+        def count(self, f, c):
+            self.modify(f, count=c + 1)
+
+    ke = Counter()
+    ke.reset()
+    ke.declare(Fact(limit=5))
+    ke.declare(Fact(size=20, count=0))
+    ke.run()
+
+    counters = [f for f in ke.facts.values() if 'count' in f]
+    assert len(counters) == 1
+    assert counters[0]['count'] == 5
+    # Once for the declare and once for each modify, instead of once
+    # for every fact entering or leaving the network.
+    assert tested == [20] * 6
+
+
+def test_modify_cascades_to_the_facts_declared_from_the_fact():
+    from experta import KnowledgeEngine, Rule, Fact, AS, MATCH
+
+    class KE(KnowledgeEngine):
+        @Rule(AS.f << Fact(n=MATCH.n))
+        def child(self, f, n):
+            self.declare(Fact(child=n))
+
+        @Rule(AS.f << Fact(n=MATCH.n), Fact(child=MATCH.n))
+        def advance(self, f, n):
+            if n < 3:
+                self.modify(f, n=n + 1)
+
+    ke = KE()
+    ke.reset()
+    ke.declare(Fact(n=0))
+    ke.run()
+
+    children = [f['child'] for f in ke.facts.values() if 'child' in f]
+    numbers = [f['n'] for f in ke.facts.values() if 'n' in f]
+    assert numbers == [3]
+    assert children == [3]
+
+
+def test_modify_to_an_existing_fact():
+    from experta import KnowledgeEngine, Fact
+
+    ke = KnowledgeEngine()
+    ke.reset()
+
+    f1 = ke.declare(Fact(a=1))
+    ke.declare(Fact(a=2))
+
+    assert ke.modify(f1, a=2) is None
+    assert f1.__factid__ not in ke.facts
+    assert len(ke.facts) == 2
+
+
+def test_modify_to_an_invalid_fact_keeps_the_fact():
+    from experta import KnowledgeEngine, Rule, Fact, Field, MATCH
+
+    class F(Fact):
+        v = Field(int, mandatory=True)
+
+    class KE(KnowledgeEngine):
+        fired = 0
+
+        @Rule(F(v=MATCH.v))
+        def r1(self, v):
+            self.fired += 1
+
+    ke = KE()
+    ke.reset()
+    f = ke.declare(F(v=1))
+
+    with pytest.raises(ValueError):
+        ke.modify(f, v='bad')
+
+    assert ke.facts[f.__factid__] is f
+    assert len(ke.agenda.activations) == 1
+
+    ke.run()
+    assert ke.fired == 1
+    assert not ke.agenda.activations
+
+
+def test_modify_refires_activations_without_the_fact():
+    from experta import KnowledgeEngine, Rule, Fact, EXISTS
+
+    class KE(KnowledgeEngine):
+        fired = 0
+
+        @Rule(EXISTS(Fact(kind='job')))
+        def r1(self):
+            self.fired += 1
+
+    ke = KE()
+    ke.reset()
+    f = ke.declare(Fact(kind='job', state='new'))
+    ke.run()
+    assert ke.fired == 1
+
+    ke.modify(f, state='done')
+    ke.run()
+    assert ke.fired == 2
+
+
+def test_modify_inside_run_doesnt_refire_activations_without_the_fact():
+    from experta import KnowledgeEngine, Rule, Fact, EXISTS
+
+    class Counter(Fact):
+        pass
+
+    class KE(KnowledgeEngine):
+        fired = 0
+
+        @Rule(Fact(go=True), EXISTS(Counter()))
+        def r1(self):
+            self.fired += 1
+            self.counter = self.modify(self.counter, n=self.fired)
+
+    ke = KE()
+    ke.reset()
+    ke.counter = ke.declare(Counter(n=0))
+    ke.declare(Fact(go=True))
+    ke.run(50)
+    assert ke.fired == 1
+
+
 def test_duplicate_declare():
     from experta import KnowledgeEngine, Fact
 
@@ -1020,3 +1220,173 @@ def test_last_activation_is_executed_2():
     ke.reset()
     ke.run()
     assert executed == ("foo", "bar")
+
+
+def test_KnowledgeEngine_custom_agenda():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH
+    from experta.agenda import HeapAgenda
+
+    fired = []
+
+    class Test(KnowledgeEngine):
+        __agenda__ = HeapAgenda
+
+        @Rule(Fact(MATCH.x))
+        def r1(self, x):
+            fired.append(x)
+
+    ke = Test()
+    ke.reset()
+    assert isinstance(ke.agenda, HeapAgenda)
+
+    ke.declare(Fact(1), Fact(2), Fact(3))
+    ke.retract(2)
+    ke.run()
+
+    assert fired == [3, 1]
+
+
+def test_KnowledgeEngine_declare_links_source_activation():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH, AS
+
+    class Test(KnowledgeEngine):
+        def deep_declare(self, depth, fact):
+            if depth:
+                return self.deep_declare(depth - 1, fact)
+            else:
+                return self.declare(fact)
+
+        @Rule(AS.parent << Fact(parent=MATCH.x))
+        def r1(self, parent, x):
+            self.deep_declare(10, Fact(child=x))
+
+    ke = Test()
+    ke.reset()
+    parent = ke.declare(Fact(parent=1))
+    assert parent.__source__ is None
+
+    ke.run()
+
+    child, = parent.__children__
+    assert child['child'] == 1
+    assert parent in child.__source__.facts
+    assert ke.current_activation is None
+
+    ke.retract(parent)
+    assert child.__factid__ not in ke.facts
+
+
+def test_KnowledgeEngine_declare_many_and_retract_many():
+    from experta import KnowledgeEngine, Rule, Fact, MATCH
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a=MATCH.x), Fact(b=MATCH.x))
+        def r1(self, x):
+            pass
+
+    ke = Test()
+    ke.reset()
+
+    calls = []
+    update_agenda = ke.strategy.update_agenda
+
+    def _update_agenda(agenda, added, removed):
+        calls.append((len(added), len(removed)))
+        return update_agenda(agenda, added, removed)
+
+    ke.strategy.update_agenda = _update_agenda
+
+    declared = ke.declare_many(
+        Fact(**{k: i}) for i in range(10) for k in ('a', 'b', 'a'))
+
+    assert len(declared) == 20
+    assert calls == [(10, 0)]
+    assert len(ke.agenda.activations) == 10
+
+    ke.retract_many(f for f in declared if 'a' in f)
+
+    assert calls == [(10, 0), (0, 10)]
+    assert len(ke.agenda.activations) == 0
+    assert len(ke.facts) == 11  # InitialFact + b facts
+
+
+@pytest.mark.parametrize('agenda', ['Agenda', 'HeapAgenda'])
+def test_KnowledgeEngine_fork(agenda):
+    from experta import KnowledgeEngine, Rule, Fact, AS, MATCH, NOT
+    from experta import agenda as agenda_module
+
+    class KE(KnowledgeEngine):
+        __agenda__ = getattr(agenda_module, agenda)
+
+        @Rule(AS.p << Fact(parent=MATCH.x), NOT(Fact(child=MATCH.x)))
+        def child(self, p, x):
+            self.declare(Fact(child=x))
+
+    ke = KE()
+    ke.reset()
+    parent = ke.declare(Fact(parent=1))
+    ke.declare(Fact(parent=2))
+
+    other = ke.fork()
+    assert other.matcher.root_node is not ke.matcher.root_node
+    assert len(other.agenda.activations) == 2
+
+    other.declare(Fact(parent=3))
+    assert len(ke.agenda.activations) == 2
+    assert len(other.agenda.activations) == 3
+
+    ke.run()
+    other.run()
+
+    def children(engine):
+        return sorted(f['child'] for f in engine.facts.values()
+                      if 'child' in f)
+
+    assert children(ke) == [1, 2]
+    assert children(other) == [1, 2, 3]
+
+    # Both engines declared a child for the shared parent.
+    ke.retract(parent)
+    assert children(ke) == [2]
+    assert children(other) == [1, 2, 3]
+
+    other.retract(parent)
+    assert children(other) == [2, 3]
+
+    ke.declare(Fact(parent=1))
+    ke.run()
+    assert children(ke) == [1, 2]
+    assert children(other) == [2, 3]
+
+
+def test_KnowledgeEngine_fork_doesnt_change_the_shared_facts():
+    from experta import KnowledgeEngine, Rule, Fact, AS, MATCH
+
+    class KE(KnowledgeEngine):
+        @Rule(AS.p << Fact(parent=MATCH.x))
+        def child(self, p, x):
+            self.declare(Fact(child=x))
+
+    ke = KE()
+    ke.reset()
+    parent = ke.declare(Fact(parent=1))
+
+    forks = [ke.fork() for _ in range(5)]
+    for other in forks:
+        other.run()
+        assert len([f for f in other.facts.values() if 'child' in f]) == 1
+
+    assert parent.__children__ == []
+    assert parent.__source__ is None
+
+    ke.run()
+    child, = [f for f in ke.facts.values() if 'child' in f]
+    assert parent.__children__ == []
+
+    # Each engine retracts only its own children.
+    ke.retract(parent)
+    assert child.__factid__ not in ke.facts
+    for other in forks:
+        assert len([f for f in other.facts.values() if 'child' in f]) == 1
+        other.retract(parent)
+        assert not [f for f in other.facts.values() if 'child' in f]
@@ -87,3 +87,24 @@ def test_factlist_raises_valueerror_on_invalid_fact():
 
     with pytest.raises(ValueError):
         flist.declare(f0)
+
+
+def test_factlist_modify():
+    from experta.factlist import FactList
+    from experta import Fact
+
+    flist = FactList()
+
+    f0 = flist.declare(Fact(a=1, b=1))
+    flist.changes
+
+    f1 = flist.modify(f0, Fact(a=1, b=2), {'b'})
+    assert f0.__factid__ not in flist
+    assert f1.__factid__ in flist
+    assert flist.changes == ([], [], [(f0, f1, {'b'})])
+
+    flist.declare(Fact(a=2))
+    flist.changes
+
+    assert flist.modify(f1, Fact(a=2), {'a', 'b'}) is None
+    assert flist.changes == ([], [f1], [])
@@ -54,3 +54,94 @@ def test_comparators(operator, x, expected):
     ke.run()
 
     assert ke.result == expected
+
+
+def test_operators_are_equal_when_built_with_same_operands():
+    assert GE(0) == GE(0)
+    assert hash(GE(0).match) == hash(GE(0).match)
+    assert GE(0) != GE(1)
+    assert GE(0) != LE(0)
+    assert IS(1) != IS(True)
+    assert BETWEEN(1, 2) == BETWEEN(1, 2)
+    assert CALL.startswith("Y") == CALL.startswith("Y")
+    assert REGEX("a+") == REGEX("a+")
+    assert LIKE("*.txt") != ILIKE("*.txt")
+
+
+def test_equal_operators_share_alpha_nodes():
+    from experta.matchers.rete.nodes import FeatureTesterNode
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(a=GE(0)), Fact(b=1))
+        def r1(self):
+            pass
+
+        @Rule(Fact(a=GE(0)), Fact(b=2))
+        def r2(self):
+            pass
+
+    ke = KE()
+    nodes = set()
+    pending = [ke.matcher.root_node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, FeatureTesterNode):
+            nodes.add(node)
+        pending.extend(child.node for child in node.children)
+
+    assert len([n for n in nodes
+                if getattr(n.matcher, 'what', None) == 'a']) == 1
+
+
+def test_identity_operators_compare_operands_by_identity():
+    from fractions import Fraction
+
+    a, b = Fraction(1, 2), Fraction(1, 2)
+    assert IS(a) == IS(a)
+    assert IS(a) != IS(b)
+    assert IS_NOT(a) != IS_NOT(b)
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(v=IS(a)))
+        def r1(self):
+            pass
+
+        @Rule(Fact(v=IS(b)))
+        def r2(self):
+            pass
+
+    ke = KE()
+    ke.reset()
+    ke.declare(Fact(v=b))
+    assert [act.rule.__name__ for act in ke.agenda.activations] == ['r2']
+
+
+def test_operators_tell_apart_operands_of_other_types():
+    from fractions import Fraction
+
+    assert CALL.f((1,)) != CALL.f((True,))
+    assert CALL.f((1,)) == CALL.f((1,))
+    assert CONTAINS(frozenset({1})) != CONTAINS(frozenset({True}))
+    assert EQ(Fraction(1, 2)) != EQ(Fraction(1, 2))
+
+    class Value:
+        def __init__(self, value):
+            self.value = value
+
+        def f(self, expected):
+            return type(self.value) is type(expected[0])
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(v=CALL.f((1,))))
+        def r1(self):
+            pass
+
+        @Rule(Fact(v=CALL.f((True,))))
+        def r2(self):
+            pass
+
+    ke = KE()
+    ke.reset()
+    ke.declare(Fact(v=Value(True)))
+    assert [act.rule.__name__ for act in ke.agenda.activations] == ['r2']
+
@@ -255,3 +255,27 @@ def test_DepthStrategy_update_agenda_different_salience():
             > order.index(act3)
             > order.index(act2)
             > order.index(act1))
+
+
+def test_DepthStrategy_does_not_retain_activations():
+    import gc
+    import weakref
+
+    from experta.strategies import DepthStrategy
+    from experta.activation import Activation
+    from experta.agenda import Agenda
+    from experta import Rule, Fact
+
+    st = DepthStrategy()
+    a = Agenda()
+
+    act = Activation(rule=Rule(), facts=(Fact(1, __factid__=1), ))
+    ref = weakref.ref(act)
+
+    st.update_agenda(a, [act], [])
+    assert a.get_next() is act
+
+    del act
+    gc.collect()
+
+    assert ref() is None
@@ -6,7 +6,7 @@ from hypothesis.database import DirectoryBasedExampleDatabase
 from hypothesis.stateful import Bundle, RuleBasedStateMachine, rule, invariant, consumes
 
 from experta.activation import Activation
-from experta.agenda import Agenda
+from experta.agenda import Agenda, HeapAgenda
 from experta.engine import KnowledgeEngine
 from experta.fact import Fact
 from experta.factlist import FactList
@@ -14,12 +14,12 @@ from experta.rule import Rule
 from experta.strategies import DepthStrategy
 
 
-def get_rule_stm(strategy):
+def get_rule_stm(strategy, agenda=Agenda):
     class StrategyStateMachine(RuleBasedStateMachine):
         def __init__(self):
             super(StrategyStateMachine, self).__init__()
             self.model = set()
-            self.agenda = Agenda()
+            self.agenda = agenda()
             self.strategy = strategy()
             self.fss = set()
 
@@ -59,3 +59,5 @@ def get_rule_stm(strategy):
 
 
 test_depthstrategy_state_machine = get_rule_stm(DepthStrategy).TestCase
+test_depthstrategy_heapagenda_state_machine = get_rule_stm(
+    DepthStrategy, HeapAgenda).TestCase
@@ -39,3 +39,73 @@ Test watchers module
 #         watcher.setLevel = MagicMock()
 #         watch(watcher)
 #         watcher.setLevel.assert_called_with(logging.DEBUG)
+
+
+def test_watch_swaps_instrumented_matcher_code(caplog):
+    import logging
+    from experta import KnowledgeEngine, Rule, Fact, MATCH
+    from experta.watchers import watch, unwatch
+    from experta.matchers.rete.check import TypeCheck
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(a=MATCH.x), Fact(b=MATCH.x))
+        def r1(self):
+            pass
+
+    def matcher_logs():
+        return {r.name for r in caplog.records
+                if r.name.startswith('experta.watchers.MATCH')}
+
+    unwatch('MATCH', 'MATCHER')
+    plain = TypeCheck.__call__.__code__
+
+    # Network built before enabling the watchers.
+    ke = KE()
+    ke.reset()
+    try:
+        with caplog.at_level(logging.DEBUG):
+            ke.declare(Fact(a=1))
+            assert not matcher_logs()
+
+            watch('MATCH', 'MATCHER')
+            assert TypeCheck.__call__.__code__ is not plain
+            ke.declare(Fact(b=1))
+            assert matcher_logs() == {'experta.watchers.MATCH',
+                                      'experta.watchers.MATCHER'}
+    finally:
+        unwatch('MATCH', 'MATCHER')
+
+    assert TypeCheck.__call__.__code__ is plain
+    assert len(ke.agenda.activations) == 1
+
+
+def test_instrumented_wraps_the_single_body_with_the_hooks():
+    from experta import watchers
+
+    calls = []
+
+    @watchers.instrumented(
+        'MATCH', 'INFO',
+        before=lambda x, y=1: calls.append(('before', x, y)),
+        after=lambda res, x, y=1: calls.append(('after', res, x, y)))
+    def add(x, y=1):
+        return x + y
+
+    plain = add.__code__
+    try:
+        watchers.unwatch()
+        assert add(1) == 2
+        assert not calls
+
+        watchers.watch('MATCH')
+        assert add.__code__ is not plain
+        assert add(1) == 2
+        assert add(1, y=2) == 3
+        assert calls == [('before', 1, 1), ('after', 2, 1, 1),
+                         ('before', 1, 2), ('after', 3, 1, 2)]
+    finally:
+        watchers.unwatch()
+        watchers._INSTRUMENTED.pop()
+
+    assert add.__code__ is plain
+    assert add(2) == 3